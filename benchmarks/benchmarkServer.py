@@ -0,0 +1,160 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import asyncio
+import multiprocessing
+import random
+import zlib
+from collections import Counter
+from typing import List
+
+from aiohttp import web
+
+lorem = (
+    'Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore et '
+    'dolore magna aliqua. Ut enim ad minim veniam, quis nostrud exercitation ullamco laboris nisi ut aliquip. ')
+words = lorem.lower().replace(',', '').replace('.', '').split()
+
+
+class SyntheticSite:
+    """
+    Feeds and article pages generated on request, spread over several loopback hosts (127.0.0.1, 127.0.0.2, ...).
+    Even feeds are RSS and odd ones Atom. A share of the URIs answer 503 the first time they are requested,
+    and the first slow_hosts hosts answer with extra latency.
+    Every article has text of its own, so none are collapsed as duplicates.
+    """
+
+    def __init__(
+            self,
+            feeds: int = 50,
+            items: int = 20,
+            article_size: int = 8 * 1024,
+            latency: float = 0.02,
+            error_rate: float = 0.0,
+            hosts: int = 4,
+            slow_hosts: int = 0,
+            slow_latency: float = 1.0,
+            port: int = 8780):
+        self.feeds = feeds
+        self.items = items
+        self.article_size = article_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.hosts = ['127.0.0.' + str(i + 1) for i in range(max(1, hosts))]
+        self.slow_hosts = set(self.hosts[:slow_hosts])
+        self.slow_latency = slow_latency
+        self.port = port
+        self.attempts = Counter()  # Path -> times requested
+
+    def host_of_feed(self, feed: int) -> str:
+        return self.hosts[feed % len(self.hosts)]
+
+    def feed_uris(self) -> List[str]:
+        return ['http://{}:{}/feed/{}'.format(self.host_of_feed(f), self.port, f) for f in range(self.feeds)]
+
+    def article_uri(self, feed: int, item: int) -> str:
+        return 'http://{}:{}/article/{}/{}'.format(self.host_of_feed(feed), self.port, feed, item)
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/feed/{feed}', self.feed)
+        app.router.add_get('/article/{feed}/{item}', self.article)
+        return app
+
+    async def delay(self, request: web.Request) -> None:
+        latency = self.latency + (self.slow_latency if request.url.host in self.slow_hosts else 0)
+        if latency:
+            await asyncio.sleep(latency)
+
+    def fails(self, path: str) -> bool:
+        """ Whether this request fails. The same URIs fail each run, and only on their first request. """
+        self.attempts[path] += 1
+        return self.attempts[path] == 1 and zlib.crc32(path.encode()) % 10000 < self.error_rate * 10000
+
+    async def feed(self, request: web.Request) -> web.Response:
+        await self.delay(request)
+        if self.fails(request.path):
+            return web.Response(status=503)
+        feed = int(request.match_info['feed'])
+        if feed % 2:
+            entries = ''.join(
+                '<entry><title>Entry {}</title><link href="{}"/></entry>'.format(i, self.article_uri(feed, i))
+                for i in range(self.items))
+            body = '<feed xmlns="http://www.w3.org/2005/Atom"><title>Feed {}</title>{}</feed>'.format(feed, entries)
+            return web.Response(text=body, content_type='application/atom+xml')
+        items = ''.join(
+            '<item><title>Item {}</title><link>{}</link></item>'.format(i, self.article_uri(feed, i))
+            for i in range(self.items))
+        body = '<rss version="2.0"><channel><title>Feed {}</title>{}</channel></rss>'.format(feed, items)
+        return web.Response(text=body, content_type='application/rss+xml')
+
+    async def article(self, request: web.Request) -> web.Response:
+        await self.delay(request)
+        if self.fails(request.path):
+            return web.Response(status=503)
+        title = '<h1>Article {feed}/{item}</h1>'.format(**request.match_info)
+        text = self.article_text(request.path)
+        return web.Response(text='<html><body>' + title + text + '</body></html>', content_type='text/html')
+
+    def article_text(self, path: str) -> str:
+        """ Paragraphs of lorem ipsum words in an order of the article's own, the same each time it's requested. """
+        rng = random.Random(path)
+        paragraphs = []
+        size = 0
+        while not paragraphs or size + len(lorem) + 7 <= self.article_size:
+            paragraph = '<p>' + ' '.join(rng.choice(words) for _ in range(lorem.count(' '))) + '.</p>'
+            paragraphs.append(paragraph)
+            size += len(paragraph)
+        return ''.join(paragraphs)
+
+
+def serve(site: SyntheticSite, ready: multiprocessing.Event) -> None:
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    runner = web.AppRunner(site.create_app(), access_log=None)
+    loop.run_until_complete(runner.setup())
+    for host in site.hosts:
+        loop.run_until_complete(web.TCPSite(runner, host, site.port).start())
+    ready.set()
+    loop.run_forever()
+
+
+class BenchmarkServer:
+    """
+    Serves a SyntheticSite from its own process, so the server's work doesn't count against the Gatherer's.
+    with BenchmarkServer(site): ...
+    """
+
+    def __init__(self, site: SyntheticSite):
+        self.site = site
+        context = multiprocessing.get_context('spawn')
+        self.ready = context.Event()
+        self.process = context.Process(target=serve, args=(site, self.ready), daemon=True)
+
+    def __enter__(self) -> SyntheticSite:
+        self.process.start()
+        if not self.ready.wait(10):
+            self.process.terminate()
+            raise RuntimeError('The benchmark server did not start.')
+        return self.site
+
+    def __exit__(self, *exc_info) -> None:
+        self.process.terminate()
+        self.process.join()
@@ -0,0 +1,243 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import Cache
+from feed import Feed
+from fileOperations import write_json_file
+from item import Item
+from preferences import Preferences
+from sqliteCache import SqliteCache
+
+try:
+    from newsStore import NewsStore
+    from textFormat import TextFormat
+except (ImportError, ValueError):  # No GTK, the benchmarks that need it are skipped
+    NewsStore = TextFormat = None
+
+default_baseline = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+Case = Tuple[str, Callable[[], Any], Callable[[Any], None]]  # Name, setup() -> state, run(state)
+
+
+def temporary_cache(directory: str, entries: int) -> Cache:
+    cache = Cache()
+    cache.cache_directory = directory
+    for i in range(entries):
+        cache.put('http://example.com/articles/' + str(i), 'Article text ' * 20)
+    return cache
+
+
+def cache_cases(directory: str, sizes: List[int]) -> List[Case]:
+    cases = []
+    for size in sizes:
+        def write_setup(size=size):
+            return temporary_cache(directory, size)
+
+        def load_setup(size=size):
+            temporary_cache(directory, size).write_cache()
+            cache = Cache()
+            cache.cache_directory = directory
+            return cache
+
+        def query_setup(size=size):
+            return temporary_cache(directory, size), ['http://example.com/articles/' + str(i) for i in range(size)]
+
+        def query(state):
+            cache, keys = state
+            for key in keys:
+                cache.query(key)
+
+        cases.append(('Cache.write_cache {}'.format(size), write_setup, lambda cache: cache.write_cache()))
+        cases.append(('Cache.load_cache {}'.format(size), load_setup, lambda cache: cache.load_cache()))
+        cases.append(('Cache.query {}'.format(size), query_setup, query))
+    return cases
+
+
+def sqlite_cache_cases(directory: str, sizes: List[int]) -> List[Case]:
+    """ The SQLite cache's startup, exit and queries should stay flat as it grows, unlike the JSON cache's. """
+    cases = []
+    for size in sizes:
+        def filled_cache(size=size) -> SqliteCache:
+            cache = SqliteCache()
+            cache.cache_directory = tempfile.mkdtemp(dir=directory)
+            with cache.connect():  # One transaction, filling isn't what's measured
+                cache.connection.execute('BEGIN')
+                for i in range(size):
+                    cache.put('http://example.com/articles/' + str(i), 'Article text ' * 20)
+            return cache
+
+        def open_setup(size=size):
+            cache = SqliteCache()
+            cache.cache_directory = filled_cache(size).cache_directory
+            return cache
+
+        def open_cache(cache):
+            cache.load_cache()
+            cache.query('http://example.com/articles/0')
+
+        def put_setup(size=size):
+            return filled_cache(size), ['http://example.com/new/' + str(i) for i in range(1000)]
+
+        def put(state):
+            cache, keys = state
+            for key in keys:
+                cache.put(key, 'Article text ' * 20)
+
+        def query_setup(size=size):
+            return filled_cache(size), ['http://example.com/articles/' + str(i) for i in range(0, size, size // 1000)]
+
+        def query(state):
+            cache, keys = state
+            for key in keys:
+                cache.query(key)
+
+        cases.append(('SqliteCache.load_cache {}'.format(size), open_setup, open_cache))
+        cases.append(('SqliteCache.put 1000 into {}'.format(size), put_setup, put))
+        cases.append(('SqliteCache.query 1000 of {}'.format(size), query_setup, query))
+        cases.append(('SqliteCache.write_cache {}'.format(size), filled_cache, lambda cache: cache.write_cache()))
+    return cases
+
+
+def news_store_cases(sizes: List[int]) -> List[Case]:
+    cases = []
+    for size in sizes:
+        def setup(size=size):
+            items = [Item('Feed', 'http://example.com/' + str(i), 'Title ' + str(i), 'Description') for i in range(size)]
+            return NewsStore(), items
+
+        def append(state):
+            store, items = state
+            for item in items:
+                store.append(item)
+
+        cases.append(('NewsStore.append {}'.format(size), setup, append))
+    return cases
+
+
+def text_format_cases(sizes: List[int]) -> List[Case]:
+    cases = []
+    for size in sizes:
+        def setup(size=size):
+            paragraph = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 8 + '\n\n'
+            article = (paragraph * (size // len(paragraph) + 1))[:size]
+            return Item('Feed', 'http://example.com/', 'Title', 'Description', article)
+
+        cases.append((
+            'TextFormat.prepare_content_display {}KB'.format(size // 1024),
+            setup,
+            lambda item: TextFormat.prepare_content_display(item)))
+    return cases
+
+
+def preferences_cases(directory: str, sizes: List[int]) -> List[Case]:
+    cases = []
+    for size in sizes:
+        def setup(size=size):
+            preferences = Preferences()
+            preferences.preferences_directory = directory
+            for i in range(size):  # Not add_feed(), which writes the file every time
+                preferences.feeds()['Feed ' + str(i)] = Feed('Feed ' + str(i), 'http://example.com/feeds/' + str(i))
+            write_json_file(
+                directory,
+                preferences.preferences_file,
+                Preferences.serialize_preferences(preferences.preferences))
+            return preferences
+
+        cases.append(('Preferences.load_preferences {}'.format(size), setup, lambda p: p.load_preferences()))
+    return cases
+
+
+def measure(setup: Callable[[], Any], run: Callable[[Any], None], repeat: int) -> float:
+    """ Fastest of several runs, each on freshly set up state. The fastest run is the least disturbed one. """
+    best = float('inf')
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """ Names of the benchmarks slower than their baseline by more than the threshold, e.g. 0.2 for 20%. """
+    return [name for name, seconds in results.items()
+            if name in baseline and seconds > baseline[name] * (1 + threshold)]
+
+
+def main(arguments: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Times Trough's hot paths and compares them to a stored baseline.")
+    parser.add_argument('--quick', action='store_true', help='only the smallest size of each benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark, the fastest counts')
+    parser.add_argument('--baseline', default=default_baseline, help='baseline file to compare against')
+    parser.add_argument('--save', action='store_true', help='record the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='slowdown flagged as a regression')
+    parser.add_argument('--filter', default='', help='only benchmarks whose name contains this')
+    args = parser.parse_args(arguments)
+
+    def sizes(*all_sizes: int) -> List[int]:
+        return list(all_sizes[:1] if args.quick else all_sizes)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cases = cache_cases(directory, sizes(10000, 100000, 1000000))
+        cases += sqlite_cache_cases(directory, sizes(10000, 100000))
+        cases += preferences_cases(directory, sizes(10000))
+        if NewsStore is not None:
+            cases += news_store_cases(sizes(10000, 100000))
+            cases += text_format_cases(sizes(1024, 100 * 1024, 5 * 1024 * 1024))
+        else:
+            print('GTK is unavailable, skipping the NewsStore and TextFormat benchmarks.', file=sys.stderr)
+
+        baseline = dict()  # type: Dict[str, float]
+        if os.path.isfile(args.baseline):
+            with open(args.baseline) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        results = dict()
+        for name, setup, run in cases:
+            if args.filter not in name:
+                continue
+            results[name] = measure(setup, run, args.repeat)
+            previous = baseline.get(name)  # type: Optional[float]
+            change = '{:+.0%}'.format(results[name] / previous - 1) if previous else 'new'
+            print('{:<48}{:>10.2f} ms {:>8}'.format(name, results[name] * 1000, change))
+
+    regressions = compare(results, baseline, args.threshold)
+    for name in regressions:
+        print('Regression: {} is more than {:.0%} slower than its baseline.'.format(name, args.threshold))
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+    return 1 if regressions and not args.save else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,155 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from threading import Lock
+from typing import Any, Dict, Iterable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarkServer import BenchmarkServer, SyntheticSite
+from cache import Cache
+from feed import Feed
+from item import Item
+from preferences import Preferences
+from shardedGatherer import create_gatherer
+
+
+class TimingStore:
+    """ Stands in for the NewsStore, remembering when each feed's first item arrived. """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.count = 0
+        self.first_item = dict()  # Feed name -> seconds from the start of the refresh
+        self.lock = Lock()
+
+    def append(self, item: Item) -> None:
+        self.extend([item])
+
+    def extend(self, items: Iterable[Item]) -> None:
+        now = time.perf_counter() - self.start
+        with self.lock:
+            for item in items:
+                self.count += 1
+                self.first_item.setdefault(item.feed_name, now)
+
+    def update_article(self, item: Item) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def cpu_seconds() -> float:
+    """ CPU time of this process and of its children that have exited, the extraction workers. """
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def run(site: SyntheticSite, network_preferences: Dict[str, int], fetch_articles: bool) -> Dict[str, Any]:
+    """ Refreshes every feed of the site once with a cold cache. """
+    feeds = [Feed('Feed ' + str(i), uri) for i, uri in enumerate(site.feed_uris())]
+    store = TimingStore()
+    cpu_start = cpu_seconds()
+    gatherer = create_gatherer(store, Cache(), network_preferences, fetch_articles, headless=True)
+    gatherer.refresh([]).result()  # Only returns once every gathering process is up
+    store.start = time.perf_counter()
+    gatherer.refresh(feeds).result()
+    elapsed = time.perf_counter() - store.start
+    stats = gatherer.stats()
+    # Waits for the workers to exit so their CPU time and RSS are counted. Only this first shutdown waits,
+    # the one stop() makes doesn't.
+    gatherer.extractor.shutdown(wait=True)
+    gatherer.stop()
+    cpu = cpu_seconds() - cpu_start
+
+    first_items = list(store.first_item.values())
+    # ru_maxrss is in KiB on Linux. For the children it's the peak of the largest one that has exited (an extraction
+    # worker, a gathering process, or the server of an earlier run), not a sum, so it's reported on its own.
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    child_peak_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        'items': store.count,
+        'seconds': elapsed,
+        'items/sec': store.count / elapsed if elapsed else 0.0,
+        'p50 time to first item': percentile(first_items, 0.5),
+        'p99 time to first item': percentile(first_items, 0.99),
+        'peak RSS (MB)': peak_rss / 1024,
+        'child peak RSS (MB)': child_peak_rss / 1024,
+        'CPU ms/item': 1000 * cpu / store.count if store.count else 0.0,
+        'failed requests': sum(outcomes.get('failed', 0) for outcomes in stats['hosts'].values()),
+        'MB transferred': stats['bytes'] / 1e6,
+    }
+
+
+def main(arguments: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Refreshes synthetic feeds served locally with the real Gatherer.')
+    parser.add_argument('--feeds', type=int, default=50)
+    parser.add_argument('--items', type=int, default=20, help='items per feed')
+    parser.add_argument('--article-size', type=int, default=8 * 1024, help='bytes per article page')
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds before every response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of URIs that fail once with a 503')
+    parser.add_argument('--hosts', type=int, default=4, help='loopback hosts the feeds are spread over')
+    parser.add_argument('--slow-hosts', type=int, default=0, help='hosts answering with extra latency')
+    parser.add_argument('--slow-latency', type=float, default=1.0, help='extra seconds of a slow host')
+    parser.add_argument('--port', type=int, default=8780)
+    parser.add_argument('--processes', type=int, default=1, help='gathering processes the feeds are spread over')
+    parser.add_argument('--headlines-only', action='store_true', help="don't fetch articles")
+    parser.add_argument('--runs', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(arguments)
+
+    site = SyntheticSite(
+        args.feeds, args.items, args.article_size, args.latency, args.error_rate,
+        args.hosts, args.slow_hosts, args.slow_latency, args.port)
+    network_preferences = Preferences.default_network_preferences()
+    network_preferences['Gathering Processes'] = args.processes
+    results = []
+    for _ in range(args.runs):
+        with BenchmarkServer(site):  # A fresh server per run, so the same requests fail every run
+            results.append(run(site, network_preferences, not args.headlines_only))
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for number, result in enumerate(results, 1):
+            print('Run {}'.format(number))
+            for name, value in result.items():
+                print('  {:<24}{:>12.3f}'.format(name, value) if isinstance(value, float)
+                      else '  {:<24}{:>12}'.format(name, value))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -20,15 +20,15 @@
 
 import os
 from threading import RLock
-from typing import Any, Callable, Hashable, Optional
+from typing import Any, Callable, Hashable, List, Optional, Tuple
 
-from utilityFunctions import ensured_read_json_file, write_json_file
+from fileOperations import ensured_read_json_file, write_json_file
 
 
 def synchronize_cache(func: Callable) -> Callable:
-    def wrapper(self, *args):
+    def wrapper(self, *args, **kwargs):
         with self.lock:
-            return func(self, *args)
+            return func(self, *args, **kwargs)
 
     return wrapper
 
@@ -51,9 +51,10 @@ class Cache:
         self.write_cache()
 
     @synchronize_cache
-    def put(self, identifier: Hashable, value: Any, fresh: bool = True):
+    def put(self, identifier: Hashable, value: Any, fresh: bool = True, feed: Optional[str] = None):
         """ Put the item in the cache with the identifier. Fresh being true indicates that this item was not retrieved
-            from the cache itself, so it should be persisted for at least one more session. """
+            from the cache itself, so it should be persisted for at least one more session.
+            The name of the feed the item came from is only recorded by the SQLite cache. """
         if identifier:
             self.cache[identifier] = CacheValue(value, fresh)
 
@@ -64,6 +65,11 @@ class Cache:
         except KeyError:
             return None
 
+    @synchronize_cache
+    def items(self, prefix: str = '') -> List[Tuple[Hashable, Any]]:
+        """ The identifiers starting with the prefix and their values. """
+        return [(k, v.value) for k, v in self.cache.items() if k.startswith(prefix)]
+
     @synchronize_cache
     def load_cache(self):
         """ Loads the cache from the cache file """
@@ -0,0 +1,94 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import codecs
+import re
+from typing import Optional
+
+try:  # Optional, only used when nothing in the document declares an encoding
+    from charset_normalizer import from_bytes
+except ImportError:
+    from_bytes = None
+
+boms = [
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),  # Checked before UTF-16, which shares its first two bytes
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+]
+
+xml_declaration = re.compile(br'^\s*<\?xml[^>]*?encoding\s*=\s*["\']([A-Za-z0-9._:-]+)["\']')
+meta_charset = re.compile(br'<meta[^>]+?charset\s*=\s*["\']?\s*([A-Za-z0-9._:-]+)', re.IGNORECASE)
+
+declaration_prefix = 4 * 1024  # Bytes searched for an XML declaration or <meta charset>
+detection_prefix = 64 * 1024  # Bytes given to the heuristic detector
+fallback = 'windows-1252'  # What browsers assume for undeclared legacy pages
+
+
+def detect_encoding(body: bytes, declared: Optional[str] = None) -> str:
+    """
+    Cheaply decides how to decode a page or feed, in order of trust:
+    byte order mark, the Content-Type charset, the XML declaration, <meta charset>.
+    Only undeclared non-UTF-8 documents fall through to heuristic detection, and only over a prefix.
+    """
+    for bom, encoding in boms:
+        if body.startswith(bom):
+            return encoding
+
+    prefix = body[:declaration_prefix]
+    candidates = [declared.encode('ascii', 'ignore') if declared else None]
+    for pattern in (xml_declaration, meta_charset):
+        match = pattern.search(prefix)
+        candidates.append(match.group(1) if match else None)
+
+    for candidate in candidates:
+        encoding = known_encoding(candidate)
+        if encoding:
+            return encoding
+
+    return guess_encoding(body[:detection_prefix])
+
+
+def known_encoding(name: Optional[bytes]) -> Optional[str]:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.decode('ascii')).name
+    except (LookupError, UnicodeDecodeError):
+        return None
+
+
+def guess_encoding(prefix: bytes) -> str:
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(prefix, final=False)  # May end mid-character
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    if from_bytes is not None:
+        best = from_bytes(prefix).best()
+        if best is not None:
+            return best.encoding
+    return fallback
+
+
+def decode(body: bytes, declared: Optional[str] = None) -> str:
+    return body.decode(detect_encoding(body, declared), errors='replace')
@@ -0,0 +1,115 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import asyncio
+import random
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+
+transient_statuses = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """ Raised instead of sending a request to a host that keeps failing. """
+
+
+def is_transient(error: BaseException) -> bool:
+    """ Whether trying the same request again later could succeed. """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in transient_statuses
+    return isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError))
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """ Seconds a 429 or 503 response asked us to wait, if it said so. """
+    headers = getattr(error, 'headers', None)
+    if headers:
+        try:
+            return max(0.0, float(headers.get('Retry-After')))
+        except (TypeError, ValueError):  # Absent, or an HTTP date
+            pass
+    return None
+
+
+max_retry_delay = 30.0  # Seconds, longer waits give up on the request instead of holding up its refresh
+
+
+def backoff_delay(
+        attempt: int,
+        base: float = 1.0,
+        cap: float = max_retry_delay,
+        rng: Callable[[], float] = random.random) -> float:
+    """ Exponential backoff with full jitter, so retries from many requests don't arrive together. """
+    return rng() * min(cap, base * 2 ** attempt)
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a host after repeated transient failures.
+    After a cooldown a single probe is let through. If it fails the cooldown doubles, if it succeeds the host is
+    trusted again. Requests already in flight when the circuit opened say nothing new, their failures are ignored.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 60.0, max_cooldown: float = 30 * 60.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.failures = Counter()  # Host -> consecutive failures
+        self.open_until = dict()  # Host -> time the next probe is allowed
+        self.cooldowns = dict()  # Host -> length of its current cooldown
+        self.probing = set()  # Hosts with a probe in flight
+
+    def allow(self, host: str, now: float) -> bool:
+        until = self.open_until.get(host)
+        if until is None:
+            return True
+        if now < until or host in self.probing:
+            return False
+        self.probing.add(host)
+        return True
+
+    def record_success(self, host: str) -> None:
+        self.failures.pop(host, None)
+        self.open_until.pop(host, None)
+        self.cooldowns.pop(host, None)
+        self.probing.discard(host)
+
+    def record_failure(self, host: str, now: float) -> None:
+        if host in self.open_until:
+            if host not in self.probing:
+                return  # Already in flight when the circuit opened
+            self.probing.discard(host)  # The probe failed
+            cooldown = min(self.cooldowns[host] * 2, self.max_cooldown)
+        else:
+            self.failures[host] += 1
+            if self.failures[host] < self.threshold:
+                return
+            cooldown = self.cooldown
+        self.cooldowns[host] = cooldown
+        self.open_until[host] = now + cooldown
+
+    def abandon(self, host: str) -> None:
+        """ A request ended without telling us anything about the host, e.g. it was cancelled. """
+        self.probing.discard(host)
+
+    def stats(self) -> Dict[str, List[str]]:
+        return {'open circuits': list(self.open_until)}
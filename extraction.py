@@ -0,0 +1,51 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from newspaper import fulltext
+
+from charsetDetection import decode
+
+
+def extraction_workers(preferred: int = 0) -> int:
+    """ A preferred count of 0 leaves one core for the GTK main thread and uses the rest. """
+    if preferred > 0:
+        return preferred
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def create_extractor(preferred_workers: int = 0) -> ProcessPoolExecutor:
+    # Spawned rather than forked, forking a process that runs GTK and an event loop thread is unsafe.
+    # Spawned workers import the main module again, trough.py leaves GTK to troughApplication.py for this reason.
+    return ProcessPoolExecutor(
+        max_workers=extraction_workers(preferred_workers),
+        mp_context=multiprocessing.get_context('spawn'))
+
+
+def extract_article(html: bytes, encoding: Optional[str] = None) -> str:
+    """
+    Runs in an extractor process. Only the raw page goes in and only the article text comes out,
+    which keeps what is pickled between processes small. The page is decoded exactly once, here.
+    """
+    return fulltext(decode(html, encoding))
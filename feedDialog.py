@@ -18,22 +18,23 @@
     Trough homepage: https://github.com/glu10/trough
 """
 
+from concurrent.futures import Future
 from typing import Any, List
 
-import feedparser
 from gi import require_version
 
 require_version('Gtk', '3.0')
-from gi.repository import Gtk
+from gi.repository import GLib, Gtk
 
 from feed import Feed
+from hostLimiter import Priority
 from utilityFunctions import decision_popup
 
 
 class FeedDialog(Gtk.Dialog):
     """ A Dialog for adding or editing information related to an RSS feed. """
 
-    def __init__(self, parent: Gtk.Widget, feed_container: Any, feed: Feed = None):
+    def __init__(self, parent: Gtk.Widget, feed_container: Any, feed: Feed = None, gatherer: Any = None):
         Gtk.Dialog.__init__(self, 'Add Feed', parent, 0, (Gtk.STOCK_CANCEL, Gtk.ResponseType.CANCEL,
                                                           Gtk.STOCK_OK, Gtk.ResponseType.OK))
         self.set_default_size(150, 100)
@@ -42,38 +43,62 @@ class FeedDialog(Gtk.Dialog):
         ok_button.grab_default()
 
         self.connect('response', self.on_dialog_response)
+        self.gatherer = gatherer  # Checks that the URI holds a feed, without one the URI is taken as is
+        self.validation = None  # Future of the check in progress
+        self.checked_uri = None  # URI of the last finished check
+        self.uri_is_feed = False  # Result of the last finished check
         num_columns = 3
         grid = Gtk.Grid(orientation=Gtk.Orientation.VERTICAL, column_spacing=num_columns)
         feed_row = FeedDialogRow(grid, 'Name of Feed', Gtk.Entry(hexpand=True))
         feed_row.set_preexisting_feeds(feed_container)
-        uri_row = UriDialogRow(grid, 'URI', Gtk.Entry(hexpand=True))
-        self.rows = [feed_row, uri_row]
+        self.uri_row = UriDialogRow(grid, 'URI', Gtk.Entry(hexpand=True))
+        self.rows = [feed_row, self.uri_row]
 
         if feed is not None:  # A feed was passed in, populate the rows with the feed information.
             self.set_title('Edit Feed')
             for row in self.rows:
                 row.fill_in(feed)
+            self.checked_uri = feed.uri  # Only check the URI again if it's changed
+            self.uri_is_feed = True
 
         self.error_label = Gtk.Label('')
         self.error_label.set_markup('<span color="red">Fill in the missing information.</span>')
         grid.attach(self.error_label, 0, len(self.rows) + 1, num_columns, 1)
+        self.spinner = Gtk.Spinner()
+        self.checking_box = self.create_checking_box()
+        grid.attach(self.checking_box, 0, len(self.rows) + 2, num_columns, 1)
 
         box = self.get_content_area()
         box.add(grid)
         box.show_all()
         self.error_label.hide()  # hidden initially, only shown if information is incomplete
+        self.checking_box.hide()  # only shown while the URI is being checked
+
+    def create_checking_box(self) -> Gtk.Box:
+        stop_button = Gtk.Button(label='Stop')
+        stop_button.set_tooltip_text('Stop checking the URI')
+        stop_button.connect('clicked', lambda button: self.stop_check())
+
+        hbox = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        hbox.pack_start(self.spinner, False, False, 0)
+        hbox.pack_start(Gtk.Label('Checking the feed...', xalign=0), True, True, 0)
+        hbox.pack_end(stop_button, False, False, 0)
+        return hbox
 
     def get_response(self) -> Feed:
         """ Primary external call. Returns a valid Feed object upon success or None otherwise. """
         ret = None
         if self.run() == Gtk.ResponseType.OK:
             ret = Feed(*(row.retrieve() for row in self.rows))  # Construct a feed object.
+        self.stop_check()
         self.destroy()
         return ret
 
     def on_dialog_response(self, parent: Gtk.Widget, response: Gtk.ResponseType):
         if response == Gtk.ResponseType.OK and not self.verify():
             self.emit_stop_by_name('response')  # stops the signal from  exiting the run() loop
+        elif response != Gtk.ResponseType.OK:
+            self.stop_check()
 
     def verify(self) -> bool:
         """ Checks each row for correctness. Issues a warning to the user if correctness is conditional. """
@@ -88,10 +113,50 @@ class FeedDialog(Gtk.Dialog):
 
         if not correct:
             self.error_label.show()
-        elif warning_list:  # The information may be valid depending on the user's wishes, prompt them.
-            self.error_label.hide()
+            return False
+        self.error_label.hide()
+
+        uri = self.uri_row.retrieve()
+        if self.gatherer is not None and self.uri_row.can_check():
+            if uri != self.checked_uri:
+                self.start_check(uri)  # OK is pressed again for the user once the check is done
+                return False
+            if not self.uri_is_feed:
+                warning_list.append('The URI ' + uri + ' did not contain a valid RSS feed.')
+
+        if warning_list:  # The information may be valid depending on the user's wishes, prompt them.
             return self.warn(warning_list)
-        return correct
+        return True
+
+    def start_check(self, uri: str) -> None:
+        """ Probes the URI through the Gatherer, keeping the dialog responsive. """
+        self.stop_check()
+        self.validation = self.gatherer.validate(
+            [Feed(self.rows[0].retrieve(), uri)], keep_probes=True, priority=Priority.INTERACTIVE)
+        self.validation.add_done_callback(lambda done: GLib.idle_add(self.check_finished, uri, done))
+        self.set_response_sensitive(Gtk.ResponseType.OK, False)
+        self.checking_box.show()
+        self.spinner.start()
+
+    def check_finished(self, uri: str, validation: Future) -> bool:
+        if validation is self.validation:  # Not stopped in the meantime
+            self.validation = None
+            self.hide_check()
+            self.checked_uri = uri
+            self.uri_is_feed = bool(validation.result())
+            self.response(Gtk.ResponseType.OK)
+        return False  # Don't repeat
+
+    def stop_check(self) -> None:
+        if self.validation is not None:
+            self.validation.cancel()
+            self.validation = None
+            self.hide_check()
+
+    def hide_check(self) -> None:
+        self.spinner.stop()
+        self.checking_box.hide()
+        self.set_response_sensitive(Gtk.ResponseType.OK, True)
 
     def warn(self, warnings: List[str]):
         warnings.append('Add feed anyway?')
@@ -166,16 +231,15 @@ class UriDialogRow(DialogRow):
         self.interactive.set_text(feed.uri)
 
     def retrieve(self) -> str:
-        return self.interactive.get_text()
-
-    def verify(self, warnings: List[str]) -> bool:
-        uri = self.retrieve()
-        if not uri:
-            return False  # A blank URI is always incorrect
-        elif not (uri.startswith('/') or uri.startswith('http://') or uri.startswith('https://')):
+        uri = self.interactive.get_text().strip()
+        if uri and not (uri.startswith('/') or uri.startswith('http://') or uri.startswith('https://')):
             # TODO: Instead of preemptively trying to fix it, probe it as is first.
             uri = 'http://' + uri  # Attempt to complete the URI
-        content = feedparser.parse(uri)  # Probe the URI
-        if not content:
-            warnings.append('The URI ' + uri + ' did not contain a valid RSS feed.')
-        return True
+        return uri
+
+    def can_check(self) -> bool:
+        """ Whether the Gatherer can probe the URI, local files can't be. """
+        return not self.retrieve().startswith('/')
+
+    def verify(self, warnings: List[str]) -> bool:
+        return bool(self.retrieve())  # A blank URI is always incorrect
@@ -0,0 +1,194 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+from typing import List, Optional
+
+import feedparser
+from lxml import etree
+
+Entry = List[str]  # [link, title]
+
+
+class StreamingFeedParser:
+    """
+    Incrementally parses RSS and Atom, handing back each entry as soon as its closing tag arrives.
+    Only the link and title are read. Anything the fast path can't handle (malformed XML, unknown formats)
+    is given to feedparser once the whole body is available.
+    """
+    entry_tags = {'item', 'entry'}
+    known_roots = {'rss', 'feed', 'RDF'}
+    hint_tags = {'ttl', 'updatePeriod', 'updateFrequency'}  # How often the publisher expects to be polled
+    discovery_rels = {'hub', 'self'}  # WebSub discovery links
+    identity_tags = {'guid', 'id'}
+    date_tags = ['updated', 'modified', 'pubDate', 'published', 'date']  # Most telling of a new version first
+
+    def __init__(self):
+        self.parser = etree.XMLPullParser(
+            events=('start', 'end'),
+            resolve_entities=False,
+            no_network=True,
+            huge_tree=True)
+        self.root_tag = None
+        self.entry_depth = 0
+        self.failed = False
+        self.entries = []  # Every entry handed back so far
+        self.links = set()
+        self.versions = dict()  # Entry link -> GUID and date of the entry, if it has either
+        self.hints = dict()  # Channel level polling hints, tag -> text
+        self.discovery = dict()  # Channel level WebSub links, rel -> href
+
+    def feed(self, chunk: bytes) -> List[Entry]:
+        """ Returns the entries completed by this chunk. """
+        if self.failed:
+            return []
+        try:
+            self.parser.feed(chunk)
+            return self.read_entries()
+        except etree.XMLSyntaxError:
+            self.failed = True
+            return []
+
+    def close(self, body: bytes) -> List[Entry]:
+        """ Returns the remaining entries. The complete body is only used if feedparser is needed. """
+        remaining = []
+        if not self.failed:
+            try:
+                self.parser.close()
+                remaining = self.read_entries()
+            except etree.XMLSyntaxError:
+                self.failed = True
+
+        if self.failed or self.root_tag not in self.known_roots:
+            remaining.extend(self.fallback(body))
+        return remaining
+
+    def is_feed(self) -> bool:
+        """ Whether what was parsed is a feed, which may be one without entries. """
+        return bool(self.entries) or (not self.failed and self.root_tag in self.known_roots)
+
+    def read_entries(self) -> List[Entry]:
+        entries = []
+        for event, element in self.parser.read_events():
+            tag = self.local_name(element)
+            if event == 'start':
+                if self.root_tag is None:
+                    self.root_tag = tag
+                elif tag in self.entry_tags:
+                    self.entry_depth += 1
+            elif tag in self.entry_tags:
+                self.entry_depth -= 1
+                entry = self.element_to_entry(element)
+                version = self.element_version(element)
+                self.discard(element)
+                if entry:
+                    entries.extend(self.accept(*entry, version))
+            elif tag in self.hint_tags and not self.entry_depth and element.text:
+                self.hints[tag] = element.text.strip()
+            elif tag == 'link' and not self.entry_depth:
+                self.discover(element.get('rel'), element.get('href'))
+        return entries
+
+    def fallback(self, body: bytes) -> List[Entry]:
+        entries = []
+        content = feedparser.parse(body)
+        hint_keys = (('ttl', 'ttl'), ('sy_updateperiod', 'updatePeriod'), ('sy_updatefrequency', 'updateFrequency'))
+        for key, tag in hint_keys:
+            if content['feed'].get(key):
+                self.hints[tag] = content['feed'][key].strip()
+        for link in content['feed'].get('links', []):
+            self.discover(link.get('rel'), link.get('href'))
+        for entry in content['entries']:
+            link = entry.get('link')
+            if link:
+                parts = [entry.get('id'), entry.get('updated') or entry.get('published')]
+                version = ' '.join(part for part in parts if part) or None
+                entries.extend(self.accept(link, entry.get('title', ''), version))
+        return entries
+
+    def discover(self, rel: Optional[str], href: Optional[str]) -> None:
+        """ The first hub and self links are kept, a feed may list several hubs. """
+        if rel in self.discovery_rels and href and rel not in self.discovery:
+            self.discovery[rel] = href.strip()
+
+    def accept(self, link: str, title: str, version: Optional[str] = None) -> List[Entry]:
+        """ Entries are unique by link, which also keeps a fallback from repeating streamed entries. """
+        if link in self.links:
+            return []
+        self.links.add(link)
+        if version:
+            self.versions[link] = version
+        entry = [link, title]
+        self.entries.append(entry)
+        return [entry]
+
+    @staticmethod
+    def element_to_entry(element: etree.ElementBase) -> Optional[Entry]:
+        link = None
+        title = ''
+        for child in element:
+            tag = StreamingFeedParser.local_name(child)
+            if tag == 'title':
+                title = ''.join(child.itertext()).strip()
+            elif tag == 'link' and link is None:
+                if child.get('href') is not None:  # Atom
+                    if child.get('rel', 'alternate') == 'alternate':
+                        link = child.get('href').strip()
+                elif child.text:  # RSS
+                    link = child.text.strip()
+        return [link, title] if link else None
+
+    @staticmethod
+    def element_version(element: etree.ElementBase) -> Optional[str]:
+        """ The entry's GUID (or Atom id) and its most telling date, which change when the entry is updated. """
+        identity = None
+        dates = dict()
+        for child in element:
+            tag = StreamingFeedParser.local_name(child)
+            text = (child.text or '').strip()
+            if tag in StreamingFeedParser.identity_tags and text and identity is None:
+                identity = text
+            elif tag in StreamingFeedParser.date_tags and text:
+                dates.setdefault(tag, text)
+        date = next((dates[tag] for tag in StreamingFeedParser.date_tags if tag in dates), None)
+        return ' '.join(part for part in (identity, date) if part) or None
+
+    @staticmethod
+    def discard(element: etree.ElementBase) -> None:
+        """ Keeps memory flat for huge feeds by dropping entries that have been read. """
+        element.clear()
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+
+    @staticmethod
+    def local_name(element: etree.ElementBase) -> str:
+        tag = element.tag
+        if not isinstance(tag, str):  # Comments and processing instructions
+            return ''
+        return tag.rsplit('}', 1)[-1]
+
+
+def parse_feed(body: bytes) -> StreamingFeedParser:
+    """ Parses a feed that has already been downloaded in full, the results are left in the parser. """
+    parser = StreamingFeedParser()
+    parser.feed(body)
+    parser.close(body)
+    return parser
@@ -0,0 +1,113 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import hashlib
+from typing import Any, Dict, List, Mapping, Optional
+
+from seenSet import SeenSet
+
+
+class FeedState:
+    """
+    What the Gatherer remembers about a feed between refreshes.
+    Persisted through the Cache so it survives restarts.
+    """
+    serializable_attributes = [
+        'etag', 'last_modified', 'digest', 'entries', 'interval', 'hint', 'hub', 'topic', 'secret', 'lease_expires',
+        'renew_after', 'seen', 'versions', 'callback']
+
+    def __init__(
+            self,
+            etag: Optional[str] = None,
+            last_modified: Optional[str] = None,
+            digest: Optional[str] = None,
+            entries: Optional[List[List[str]]] = None,
+            interval: Optional[float] = None,
+            hint: Optional[float] = None,
+            hub: Optional[str] = None,
+            topic: Optional[str] = None,
+            secret: Optional[str] = None,
+            lease_expires: Optional[float] = None,
+            renew_after: Optional[float] = None,
+            seen: Optional[Dict[str, Any]] = None,
+            versions: Optional[Dict[str, str]] = None,
+            callback: Optional[str] = None):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest  # Hash of the last body, for servers that send no validators
+        self.entries = entries if entries is not None else []  # [link, title] of the last parse
+        self.versions = versions if versions is not None else dict()  # Link -> GUID and date, of the last parse
+        self.interval = interval  # Seconds between background polls
+        self.hint = hint  # Seconds between polls the feed itself asks for
+        self.hub = hub  # WebSub hub the feed advertises
+        self.topic = topic  # The feed's own (self) URI, which the hub knows it by
+        self.secret = secret  # Shared with the hub to sign what it pushes
+        self.callback = callback  # Random id of the callback the hub pushes to, None if not subscribed
+        self.lease_expires = lease_expires  # When the hub's subscription runs out, None if not subscribed
+        self.renew_after = renew_after  # When the subscription is renewed, a while before it runs out
+        self.seen = SeenSet.from_dict(seen) if seen else SeenSet()  # Entries gathered in earlier sessions
+
+    def pushed(self, now: float) -> bool:
+        """ Whether a hub pushes updates of the feed, so it only needs the occasional poll. """
+        return self.lease_expires is not None and self.lease_expires > now
+
+    @staticmethod
+    def cache_key(feed_uri: str) -> str:
+        return 'feed:' + feed_uri
+
+    @classmethod
+    def from_dict(cls, attributes: Dict[str, Any]):
+        """ Deserialization """
+        return cls(**attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ Serialization """
+        attributes = {attribute: getattr(self, attribute) for attribute in self.serializable_attributes}
+        attributes['seen'] = self.seen.to_dict()
+        return attributes
+
+    def request_headers(self) -> Dict[str, str]:
+        """ Headers that let the server answer 304 Not Modified. """
+        headers = dict()
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def needs_body_comparison(self, headers: Mapping[str, str]) -> bool:
+        """ A server that sends no validators can only be checked for changes by comparing bodies. """
+        return self.digest is not None and not headers.get('ETag') and not headers.get('Last-Modified')
+
+    @staticmethod
+    def digest_of(body: bytes) -> str:
+        return hashlib.sha1(body).hexdigest()
+
+    def revalidate(self, headers: Mapping[str, str], body: bytes) -> bool:
+        """
+        Remember the validators of a fresh response.
+        Returns whether the body differs from the one previously seen.
+        """
+        self.etag = headers.get('ETag')
+        self.last_modified = headers.get('Last-Modified')
+        digest = self.digest_of(body)
+        changed = digest != self.digest
+        self.digest = digest
+        return changed
@@ -0,0 +1,53 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2015 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import errno
+import json
+import os
+from typing import Any
+
+
+def ensure_directory_exists(directory: str):
+    """ Checks to see if the given directory exists, and if it doesn't creates it. """
+    try:
+        os.makedirs(directory)
+    except OSError as exception:
+        if exception.errno != errno.EEXIST:
+            raise
+
+
+def ensured_read_json_file(containing_directory: str, filename: str, defaults: Any):
+    """ Read a JSON file or pass back the defaults if the file doesn't exist. """
+    file_path = os.path.join(containing_directory, filename)
+    if not os.path.isfile(file_path):
+        return defaults
+
+    with open(file_path, 'r') as data_file:
+        try:
+            return json.load(data_file)
+        except json.decoder.JSONDecodeError as e:
+            raise RuntimeError('Error parsing the JSON in ' + file_path + ', is it valid JSON?') from e
+
+
+def write_json_file(containing_directory: str, filename: str, data):
+    ensure_directory_exists(containing_directory)
+    file_path = os.path.join(containing_directory, filename)
+    with open(file_path, 'w') as data_file:
+        json.dump(data, data_file)
@@ -0,0 +1,122 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Dict, Iterator, List
+
+stages = ['queue', 'connect', 'download', 'parse', 'extract', 'insert']
+
+
+class StageTiming:
+    """ How often a stage ran and how long it took. """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.longest = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.longest = max(self.longest, seconds)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'longest': self.longest,
+        }
+
+
+class GatherStats:
+    """
+    Where the Gatherer's time and bytes go, recorded from its loop, its extractor and the main thread.
+    Everything is guarded by a single lock so snapshot() can be called from any thread.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.timings = {stage: StageTiming() for stage in stages}
+        self.bytes = 0
+        self.started = 0  # Requests (feeds and items) begun
+        self.finished = 0  # Requests that succeeded, failed for good or were cancelled
+        self.feeds = defaultdict(Counter)  # Feed name -> outcome -> count
+        self.hosts = defaultdict(Counter)  # Host -> outcome -> count
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self.lock:
+            self.timings[stage].add(seconds)
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        """ with stats.timed('parse'): ... also works around an await. """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def transferred(self, size: int) -> None:
+        with self.lock:
+            self.bytes += size
+
+    def start(self) -> None:
+        with self.lock:
+            self.started += 1
+
+    def finish(self, feed_name: str, host: str, outcome: str) -> None:
+        """ outcome is one of 'succeeded', 'failed' or 'cancelled'. """
+        with self.lock:
+            self.finished += 1
+            self.feeds[feed_name][outcome] += 1
+            self.hosts[host][outcome] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'timings': {stage: timing.to_dict() for stage, timing in self.timings.items()},
+                'bytes': self.bytes,
+                'started': self.started,
+                'finished': self.finished,
+                'feeds': {name: dict(outcomes) for name, outcomes in self.feeds.items()},
+                'hosts': {host: dict(outcomes) for host, outcomes in self.hosts.items()},
+            }
+
+
+def merge_snapshots(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """ Combines the snapshots of several GatherStats, e.g. one per gathering process. """
+    merged = GatherStats()
+    for snapshot in snapshots:
+        merged.bytes += snapshot['bytes']
+        merged.started += snapshot['started']
+        merged.finished += snapshot['finished']
+        for stage, timing in snapshot['timings'].items():
+            combined = merged.timings[stage]
+            combined.count += timing['count']
+            combined.total += timing['total']
+            combined.longest = max(combined.longest, timing['longest'])
+        for totals, outcomes in [(merged.feeds, snapshot['feeds']), (merged.hosts, snapshot['hosts'])]:
+            for name, counts in outcomes.items():
+                totals[name].update(counts)
+    return merged.snapshot()
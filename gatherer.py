@@ -19,73 +19,834 @@
 """
 
 import asyncio
-from threading import Thread
-from typing import Awaitable, Tuple, Union
+import hashlib
+import logging
+import sys
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from threading import Lock, Thread
+from concurrent.futures import Executor, Future
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, \
+    Set, Tuple, Union
 
 import aiohttp
-import feedparser
-from aiohttp import ClientSession
-from newspaper import fulltext
+from aiohttp import ClientResponse, ClientSession
+from multidict import CIMultiDict
 
+from cache import Cache
+from circuitBreaker import CircuitBreaker, CircuitOpenError, backoff_delay, is_transient, max_retry_delay, retry_after
+from extraction import create_extractor, extract_article
 from feed import Feed
-import gi
-gi.require_version('Gdk', '3.0')
-from gi.repository import Gdk, GLib
+from feedParser import Entry, StreamingFeedParser, parse_feed
+from feedState import FeedState
+from gatherStats import GatherStats
+from hostLimiter import HostLimiter, Priority
+from pollScheduler import PUSHED_INTERVAL, PollScheduler, feed_hint, max_age, next_interval
+from requestCoalescer import RequestCoalescer, normalize_uri
+from seenSet import SEEN, UPDATED
+from simHash import SimHashIndex, simhash
 from item import Item
-from newsStore import NewsStore
+from webSub import WebSubServer
+
+if TYPE_CHECKING:
+    from newsStore import NewsStore
+
+logger = logging.getLogger(__name__)
+
+Probe = Tuple[Mapping[str, str], bytes, Optional[str]]  # Headers, body and encoding of a feed downloaded by validate()
+
+refresh_generation = ContextVar('refresh_generation', default=0)  # The refresh a task was spawned for, 0 if none
 
 
 class Gatherer(Thread):
-    def __init__(self, store: NewsStore):
+    chunk_size = 16 * 1024  # Bytes handed to the feed parser at a time
+    drain_interval = 16  # Milliseconds between hand-offs to the main thread, about a frame
+    drain_budget = 0.008  # Seconds the main thread may spend inserting items per hand-off
+    drain_batch = 50  # Items inserted between budget checks
+    retry_attempts = 3  # Tries per request before giving up on it
+    shutdown_timeout = 2  # Seconds stop() waits for outstanding work to be cancelled
+    probe_lifetime = 300  # Seconds a feed downloaded by validate() can stand in for its first request
+    extracted_pages = 1000  # Recently extracted pages whose article is reused when the same page comes up again
+    duplicate_min_words = 50  # Shorter articles (teasers, paywall notices) are too alike to be told apart
+    duplicate_window = 10000  # Most recent articles a new one is compared with to find copies
+
+    def __init__(
+            self,
+            store: 'NewsStore',
+            cache: Cache,
+            network_preferences: Dict[str, int],
+            fetch_articles: bool = True,
+            headless: bool = False,
+            main_context: bool = False):
+        """
+        With fetch_articles off, items reach the store with only their headline
+        and articles are fetched as the reader gets near them, see read().
+        Headless, there is no GTK main loop and the store is filled from the Gatherer's own thread.
+        With main_context, requests run on the GTK main context instead of a thread of their own,
+        which needs the GLibEventLoopPolicy installed before the application runs, see main_context_loop().
+        The store is then filled directly, and parsing moves to a thread so it doesn't hold up drawing.
+        """
         super().__init__(target=self.work_loop, daemon=True)
-        self.loop = asyncio.new_event_loop()
-        self.session = aiohttp.ClientSession(loop=self.loop)
+        self.main_context = main_context and main_context_loop() is not None
+        self.loop = main_context_loop() if self.main_context else asyncio.new_event_loop()
+        self.network_preferences = network_preferences
+        self.gather_stats = GatherStats()
+        self.session = aiohttp.ClientSession(
+            connector=self.create_connector(network_preferences),
+            timeout=self.create_timeout(network_preferences),
+            trace_configs=[self.create_trace_config()],
+            loop=self.loop)
+        self.host_limiter = HostLimiter(
+            network_preferences['Per-Host Connection Limit'],
+            network_preferences['Connection Limit'])
+        self.extractor = self.create_extractor(network_preferences)
         self.store = store
-        self.start()
+        self.cache = cache
+        self.fetch_articles = fetch_articles
+        self.add_main_thread_timeout = None if headless else main_thread_timeout()
+        self.headless = self.add_main_thread_timeout is None
+        self.web_sub = self.create_web_sub(network_preferences)
+        self.prefetches = dict()  # Item URI -> (task fetching its article for the reader, its priority)
+        self.probes = dict()  # Normalized feed URI -> Probe of a feed that passed validate()
+        self.feed_states = dict()  # Feed URI -> FeedState
+        self.renewals = dict()  # Feed URI -> timer renewing its WebSub subscription
+        self.claimed = set()  # (feed name, item URI) of items dispatched or in the store, while the feed lists them
+        self.duplicates = SimHashIndex(capacity=self.duplicate_window)  # SimHash of an article -> Item it was first in
+        self.extracted = OrderedDict()  # Digest of a page -> its article, least recently used first
+        self.pending_items = deque()  # Items waiting for the main thread
+        self.pending_articles = deque()  # Items in the store whose article arrived
+        self.pending_lock = Lock()
+        self.drain_scheduled = False
+        self.poll_scheduler = PollScheduler()
+        self.coalescer = RequestCoalescer()
+        self.circuit_breaker = CircuitBreaker()
+        self.poll_wakeup = asyncio.Event()
+        self.refresh_generation = 0
+        self.refresh_tasks = set()  # Outstanding tasks of the latest refresh
+        self.tasks = set()  # Outstanding tasks of this Gatherer, the main context's loop also runs others
+        if self.main_context:
+            self.start_background_tasks()
+        else:
+            self.start()
+
+    def create_connector(self, network_preferences: Dict[str, int]) -> aiohttp.TCPConnector:
+        """ Pooled, keep-alive connections with cached DNS lookups. """
+        return aiohttp.TCPConnector(
+            limit=network_preferences['Connection Limit'],
+            limit_per_host=network_preferences['Per-Host Connection Limit'],
+            keepalive_timeout=network_preferences['Keep-Alive Timeout'],
+            ttl_dns_cache=network_preferences['DNS Cache TTL'],
+            loop=self.loop)
+
+    @staticmethod
+    def create_extractor(network_preferences: Dict[str, int]) -> Executor:
+        return create_extractor(network_preferences['Extraction Workers'])
+
+    @staticmethod
+    def create_timeout(network_preferences: Dict[str, int]) -> aiohttp.ClientTimeout:
+        """ Deadlines per request, so a stuck socket gives up its slot instead of holding it forever. """
+        return aiohttp.ClientTimeout(
+            total=network_preferences['Total Timeout'],
+            sock_connect=network_preferences['Connect Timeout'],
+            sock_read=network_preferences['First Byte Timeout'])
+
+    def create_trace_config(self) -> aiohttp.TraceConfig:
+        """ Times new connections, reused ones cost nothing to connect. """
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_start.append(self.on_connection_create_start)
+        trace_config.on_connection_create_end.append(self.on_connection_create_end)
+        return trace_config
+
+    @staticmethod
+    async def on_connection_create_start(session: ClientSession, context: Any, params: Any) -> None:
+        context.connect_start = time.perf_counter()
+
+    async def on_connection_create_end(self, session: ClientSession, context: Any, params: Any) -> None:
+        self.gather_stats.record('connect', time.perf_counter() - context.connect_start)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Thread-safe snapshot of the Gatherer's network activity.
+        Stage timings, bytes and outcomes per feed and host come from GatherStats.
+        """
+        stats = dict(self.network_preferences)
+        stats.update(self.host_limiter.stats())
+        stats['in flight'] = len(self.coalescer)
+        stats['prefetching'] = len(self.prefetches)
+        stats.update(self.circuit_breaker.stats())
+        stats.update(self.gather_stats.snapshot())
+        return stats
 
     def work_loop(self) -> None:
         asyncio.set_event_loop(self.loop)
+        self.start_background_tasks()
         self.loop.run_forever()
-        self.session.close()
         self.loop.close()
 
+    def create_web_sub(self, network_preferences: Dict[str, int]) -> Optional[WebSubServer]:
+        """ Off without a callback URL hubs can reach, and headless, where a run ends before anything is pushed. """
+        if self.headless or not network_preferences['Push Callback URL']:
+            return None
+        return WebSubServer(
+            network_preferences['Push Callback URL'],
+            network_preferences['Push Port'],
+            self.on_push,
+            self.on_push_verified)
+
+    def start_background_tasks(self) -> None:
+        self.spawn(self.poll_loop())
+        if self.web_sub is not None:
+            self.spawn(self.start_push())
+
+    async def start_push(self) -> None:
+        try:
+            await self.web_sub.start()
+        except OSError as e:
+            logger.warning('Push updates are off, could not listen on port %d: %r', self.web_sub.port, e)
+            self.web_sub = None
+
     def stop(self) -> None:
-        self.loop.call_soon_threadsafe(self.loop.stop)
+        """ Cancels everything outstanding and closes the connections, waiting only briefly for that to happen. """
+        if self.loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self.shutdown(), self.loop)
+        if not self.main_context:  # On the main context, waiting here would keep shutdown() from running
+            self.join(self.shutdown_timeout)
+
+    async def shutdown(self) -> None:
+        tasks = self.tasks if self.main_context else asyncio.all_tasks(self.loop)
+        tasks = [task for task in tasks if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.web_sub is not None:
+            await self.web_sub.stop()
+        await self.session.close()
+        self.extractor.shutdown(wait=False, cancel_futures=True)
+        if not self.main_context:  # The main context's loop belongs to GTK
+            self.loop.stop()
+
+    def request(self, request: Union[Feed, Item], priority: Priority = Priority.FOREGROUND) -> None:
+        self.loop.call_soon_threadsafe(self.spawn, self.serve_request(request, self.session, priority))
+
+    def refresh(self, feeds: Iterable[Feed]) -> Future:
+        """
+        Requests every feed now. Whatever is left of the previous refresh is cancelled, this one supersedes it.
+        The returned future is done once the feeds and all of their items are, or once the refresh is superseded.
+        """
+        return asyncio.run_coroutine_threadsafe(self.run_refresh(list(feeds)), self.loop)
+
+    async def run_refresh(self, feeds: List[Feed]) -> None:
+        tasks = self.start_refresh(feeds)
+        while tasks:  # Feeds keep adding item tasks while they stream in
+            await asyncio.wait(list(tasks))
+
+    def start_refresh(self, feeds: List[Feed]) -> Set[asyncio.Task]:
+        stale = self.refresh_tasks
+        self.refresh_generation += 1
+        self.refresh_tasks = set()
+        for task in stale:
+            task.cancel()
+
+        token = refresh_generation.set(self.refresh_generation)  # Inherited by every task the refresh spawns
+        try:
+            for feed in feeds:
+                self.spawn(self.serve_request(feed, self.session, Priority.FOREGROUND))
+        finally:
+            refresh_generation.reset(token)
+        return self.refresh_tasks
+
+    def spawn(self, coroutine: Awaitable) -> asyncio.Task:
+        """ Tasks spawned on behalf of the latest refresh, directly or by its feeds, are cancelled with it. """
+        task = self.loop.create_task(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        generation = refresh_generation.get()
+        if generation and generation == self.refresh_generation:
+            self.refresh_tasks.add(task)
+            task.add_done_callback(self.refresh_tasks.discard)
+        return task
+
+    def validate(
+            self,
+            feeds: Iterable[Feed],
+            progress: Optional[Callable[[Feed, bool], None]] = None,
+            keep_probes: bool = False,
+            priority: Priority = Priority.FOREGROUND) -> Future:
+        """
+        Checks that each feed can be downloaded and parsed as a feed, all of them at once within the connection limits.
+        progress is called on the Gatherer's thread as each feed is checked, with whether it passed.
+        With keep_probes, the feeds that pass are kept for a while, so that adding them right after doesn't download
+        them again, see take_probe(). Only worth it for a feed or two, each probe holds a whole feed in memory.
+        A feed the user is waiting on in a dialog is checked at INTERACTIVE priority, ahead of a refresh.
+        The returned future's result is the feeds that passed, cancelling it stops the remaining checks.
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self.validate_feeds(list(feeds), progress, keep_probes, priority), self.loop)
+
+    async def validate_feeds(
+            self,
+            feeds: List[Feed],
+            progress: Optional[Callable[[Feed, bool], None]],
+            keep_probes: bool,
+            priority: Priority) -> List[Feed]:
+        passed = await asyncio.gather(
+            *[self.spawn(self.validate_feed(feed, progress, keep_probes, priority)) for feed in feeds])
+        return [feed for feed, valid in zip(feeds, passed) if valid]
+
+    async def validate_feed(
+            self,
+            feed: Feed,
+            progress: Optional[Callable[[Feed, bool], None]],
+            keep_probes: bool,
+            priority: Priority) -> bool:
+        try:
+            probe = await self.retrying(feed.uri, lambda: self.probe(feed.uri, self.session, priority))
+            valid = (await self.parse(parse_feed, probe[1])).is_feed()
+            if valid and keep_probes:
+                self.keep_probe(feed.uri, probe)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info('%s is not a usable feed: %r', feed.uri, e)
+            valid = False
+        if progress is not None:
+            progress(feed, valid)
+        return valid
+
+    async def probe(self, uri: str, session: ClientSession, priority: Priority) -> Probe:
+        async with self.admitted(uri, priority), session.get(uri) as resp:
+            resp.raise_for_status()
+            body = await resp.read()
+            self.gather_stats.transferred(len(body))
+            return CIMultiDict(resp.headers), body, resp.charset
+
+    def keep_probe(self, uri: str, probe: Probe) -> None:
+        key = normalize_uri(uri)
+        self.probes[key] = probe
+        self.loop.call_later(self.probe_lifetime, self.drop_probe, key, probe)
+
+    def drop_probe(self, key: str, probe: Probe) -> None:
+        if self.probes.get(key) is probe:
+            self.probes.pop(key, None)  # take_probe() may be called from another thread
+
+    def take_probe(self, uri: str) -> Optional[Probe]:
+        return self.probes.pop(normalize_uri(uri), None)
+
+    def schedule(self, feeds: Iterable[Feed]) -> None:
+        """ Sets which feeds are polled in the background, each on its own interval. """
+        self.loop.call_soon_threadsafe(self.set_polled_feeds, list(feeds))
+
+    def set_polled_feeds(self, feeds: List[Feed]) -> None:
+        self.poll_scheduler.set_feeds([(feed, self.feed_state(feed).interval) for feed in feeds], time.time())
+        self.poll_wakeup.set()
+        if self.web_sub is not None:
+            self.set_pushed_feeds(feeds)
+
+    def set_pushed_feeds(self, feeds: List[Feed]) -> None:
+        """ Pushes for subscriptions of earlier sessions are accepted right away, removed feeds are unsubscribed. """
+        uris = {feed.uri for feed in feeds}
+        for feed, state in list(self.web_sub.feeds.values()):
+            if feed.uri not in uris and state.lease_expires:
+                self.cancel_renewal(feed)
+                self.spawn(self.change_subscription(feed, state, 'unsubscribe'))
+        for feed in feeds:
+            state = self.feed_state(feed)
+            self.web_sub.register(feed, state)
+            if state.renew_after:
+                self.schedule_renewal(feed, state)
+
+    def schedule_renewal(self, feed: Feed, state: FeedState) -> None:
+        """
+        Leases are renewed on a timer of their own, as an unchanged feed's polls can be further apart.
+        A feed has one timer at most, scheduling it again replaces it.
+        """
+        self.cancel_renewal(feed)
+        self.renewals[feed.uri] = self.loop.call_later(
+            max(0.0, state.renew_after - time.time()), self.renew_subscription, feed, state)
+
+    def cancel_renewal(self, feed: Feed) -> None:
+        timer = self.renewals.pop(feed.uri, None)
+        if timer is not None:
+            timer.cancel()
+
+    def renew_subscription(self, feed: Feed, state: FeedState) -> None:
+        self.renewals.pop(feed.uri, None)
+        if self.web_sub is not None and self.web_sub.is_registered(state) \
+                and self.web_sub.needs_subscription(feed, state, time.time()):
+            self.spawn(self.change_subscription(feed, state, 'subscribe'))
+
+    async def change_subscription(self, feed: Feed, state: FeedState, mode: str) -> None:
+        try:
+            await self.retrying(state.hub, lambda: self.web_sub.subscribe(self.session, feed, state, mode))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning('Could not %s to %s through %s: %r', mode, feed.uri, state.hub, e)
+
+    def on_push(self, feed: Feed, body: bytes, encoding: Optional[str]) -> None:
+        self.spawn(self.serve_push(feed, body))
+
+    async def serve_push(self, feed: Feed, body: bytes) -> None:
+        """ Hubs push new entries, sometimes along with the rest of the feed. They're dispatched like polled ones. """
+        self.gather_stats.transferred(len(body))
+        parser = await self.parse(parse_feed, body)
+        self.dispatch_entries(feed, self.session, Priority.FOREGROUND, parser.entries, parser.versions)
+        state = self.feed_state(feed)  # What was seen changed
+        self.cache.put(FeedState.cache_key(feed.uri), state.to_dict(), feed=feed.name)
 
-    def request(self, request: Union[Feed, Item]) -> None:
-        asyncio.run_coroutine_threadsafe(self.serve_request(request, self.session), self.loop)
+    def on_push_verified(self, feed: Feed, state: FeedState) -> None:
+        self.cache.put(FeedState.cache_key(feed.uri), state.to_dict(), feed=feed.name)
+        if state.renew_after:
+            self.schedule_renewal(feed, state)
+        else:
+            self.cancel_renewal(feed)
+
+    async def poll_loop(self) -> None:
+        while True:
+            for feed in self.poll_scheduler.due_feeds(time.time()):
+                self.spawn(self.serve_request(feed, self.session, Priority.BACKGROUND))
+
+            try:
+                await asyncio.wait_for(self.poll_wakeup.wait(), self.poll_scheduler.seconds_until_next(time.time()))
+            except asyncio.TimeoutError:
+                pass
+            self.poll_wakeup.clear()
+
+    def batch_requests(self, requests, session: ClientSession, priority: Priority) -> Awaitable:
+        return asyncio.gather(*[self.spawn(self.serve_request(r, session, priority)) for r in requests])
+
+    async def serve_request(self, request, session: ClientSession, priority: Priority = Priority.FOREGROUND) -> None:
+        """
+        Items found in a feed inherit the feed's priority.
+        Duplicate requests (a double refresh, an article syndicated by several feeds) share one download.
+        A request that fails for good is dropped on its own, without affecting the rest of its batch.
+        """
+        feed_name = request.name if isinstance(request, Feed) else request.feed_name
+        host = HostLimiter.host_of(request.uri)
+        self.gather_stats.start()
+        try:
+            if isinstance(request, Feed):
+                await self.coalescer.run(request.uri, lambda: self.serve_feed_request(request, session, priority))
+            else:
+                await self.serve_item(request, session, priority)
+        except asyncio.CancelledError:
+            self.gather_stats.finish(feed_name, host, 'cancelled')
+            raise
+        except Exception as e:
+            self.gather_stats.finish(feed_name, host, 'failed')
+            logger.warning('Could not gather %s: %r', request.uri, e)
+        else:
+            self.gather_stats.finish(feed_name, host, 'succeeded')
+
+    async def serve_item(self, item: Item, session: ClientSession, priority: Priority) -> None:
+        """ An item that doesn't make it to the store is unclaimed, so a later refresh dispatches it again. """
+        try:
+            if self.fetch_articles:
+                await self.gather_article(item, session, priority)
+            else:  # The article is fetched once the reader gets near it
+                item.article = self.cache.query(item.uri)
+            if not self.collapse_duplicate(item):
+                self.add_to_store(item)
+        except BaseException:
+            self.claimed.discard((item.feed_name, item.uri))
+            raise
+
+    def collapse_duplicate(self, item: Item) -> bool:
+        """
+        An item whose article nearly matches that of an item from another feed already in the store, e.g. a wire
+        story syndicated by several feeds, isn't added. The item in the store lists its feed instead.
+        Items alike within one feed (a template, a series) are all kept. Returns whether the item was collapsed.
+        """
+        fingerprint = self.fingerprint(item)
+        if fingerprint is None:
+            return False
+        original = self.duplicates.find(fingerprint)
+        if original is None:
+            self.duplicates.add(fingerprint, item)
+            return False
+        if item.feed_name in original.feeds:
+            return False
+        original.feeds.append(item.feed_name)
+        original.feed_name = ', '.join(original.feeds)
+        self.update_in_store(original)
+        return True
+
+    def fingerprint(self, item: Item) -> Optional[int]:
+        if not item.article or len(item.article.split()) < self.duplicate_min_words:
+            return None
+        return simhash(item.article)
+
+    async def gather_article(self, item: Item, session: ClientSession, priority: Priority) -> None:
+        article = self.cache.query(item.uri)
+        if article is None:  # Not scraped before
+            article = await self.coalescer.run(item.uri, lambda: self.serve_article_request(item, session, priority))
+        item.article = article
+
+    def read(self, current: Item, upcoming: List[Item]) -> None:
+        """
+        Tells the Gatherer which item the reader is on and which ones they will likely read next.
+        The current article is fetched right away, the upcoming ones are prefetched in the background,
+        and prefetches the reader has moved away from are cancelled.
+        """
+        self.loop.call_soon_threadsafe(self.set_reading_position, current, upcoming)
+
+    def set_reading_position(self, current: Item, upcoming: List[Item]) -> None:
+        """
+        A prefetch the reader catches up with is started over as INTERACTIVE, so it no longer waits behind polls
+        or within the background share of the connections.
+        """
+        wanted = {item.uri for item in upcoming}
+        for uri, (task, _) in list(self.prefetches.items()):
+            if uri not in wanted and uri != current.uri:
+                task.cancel()
+                del self.prefetches[uri]
+
+        for item, priority in [(current, Priority.INTERACTIVE)] + [(item, Priority.BACKGROUND) for item in upcoming]:
+            if item.article is not None:
+                continue
+            if item.uri in self.prefetches:
+                task, fetching_priority = self.prefetches[item.uri]
+                if fetching_priority <= priority:
+                    continue
+                task.cancel()
+            task = self.spawn(self.serve_reader_request(item, priority))
+            task.add_done_callback(lambda done, uri=item.uri: self.prefetch_done(uri, done))
+            self.prefetches[item.uri] = (task, priority)
+
+    def prefetch_done(self, uri: str, task: asyncio.Task) -> None:
+        if uri in self.prefetches and self.prefetches[uri][0] is task:
+            del self.prefetches[uri]
+
+    async def serve_reader_request(self, item: Item, priority: Priority) -> None:
+        try:
+            await self.gather_article(item, self.session, priority)
+            fingerprint = self.fingerprint(item)
+            if fingerprint is not None and self.duplicates.find(fingerprint) is None:
+                self.duplicates.add(fingerprint, item)  # Copies of it gathered later are collapsed into it
+            self.update_in_store(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning('Could not gather %s: %r', item.uri, e)
+
+    async def retrying(self, uri: str, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Retries transient failures with jittered exponential backoff.
+        Hosts that keep failing are cut off by the circuit breaker, so they stop taking up connection slots.
+        """
+        host = HostLimiter.host_of(uri)
+        for attempt_number in range(self.retry_attempts):
+            if not self.circuit_breaker.allow(host, time.time()):
+                raise CircuitOpenError('Not contacting ' + host + ' after repeated failures.')
+            try:
+                result = await attempt()
+            except Exception as e:
+                if not is_transient(e):
+                    self.circuit_breaker.record_success(host)  # The host answered, the request itself is bad
+                    raise
+                self.circuit_breaker.record_failure(host, time.time())
+                if attempt_number + 1 == self.retry_attempts:
+                    raise
+                delay = retry_after(e)
+                if delay is None:
+                    delay = backoff_delay(attempt_number)
+                elif delay > max_retry_delay:
+                    raise  # The next refresh tries again, most likely after the host asked for
+                await asyncio.sleep(delay)
+            except BaseException:
+                self.circuit_breaker.abandon(host)
+                raise
+            else:
+                self.circuit_breaker.record_success(host)
+                return result
+
+    async def serve_article_request(self, item: Item, session: ClientSession, priority: Priority) -> str:
+        body, encoding = await self.retrying(item.uri, lambda: self.download(item.uri, session, priority))
+        return await self.service(item, session, priority, body, encoding)  # Connection is already back in the pool
+
+    async def download(self, uri: str, session: ClientSession, priority: Priority) -> Tuple[bytes, Optional[str]]:
+        async with self.admitted(uri, priority), session.get(uri) as resp:
+            resp.raise_for_status()
+            body = await resp.read()
+            self.gather_stats.transferred(len(body))
+            return body, resp.charset
+
+    @asynccontextmanager
+    async def admitted(self, uri: str, priority: Priority) -> AsyncIterator[None]:
+        """ Holds a HostLimiter slot, timing the wait for it as 'queue' and the time it's held as 'download'. """
+        start = time.perf_counter()
+        async with self.host_limiter.slot(uri, priority):
+            self.gather_stats.record('queue', time.perf_counter() - start)
+            with self.gather_stats.timed('download'):
+                yield
+
+    async def serve_feed_request(self, feed: Feed, session: ClientSession, priority: Priority) -> None:
+        """ Conditional GET: unchanged feeds are neither downloaded again nor parsed. """
+        state = self.feed_state(feed)
+        probe = self.take_probe(feed.uri)
+        if probe is None:
+            changed, cache_max_age = await self.retrying(
+                feed.uri, lambda: self.fetch_feed(feed, session, priority, state))
+        else:  # Downloaded moments ago by validate()
+            changed, cache_max_age = await self.serve_probe(feed, session, priority, state, probe)
+
+        now = time.time()
+        if self.web_sub is not None and self.web_sub.needs_subscription(feed, state, now):
+            self.spawn(self.change_subscription(feed, state, 'subscribe'))
+        pushed_interval = PUSHED_INTERVAL if state.pushed(now) else None  # Polling is only a fallback then
+        state.interval = next_interval(state.interval, changed, state.hint, cache_max_age, pushed_interval)
+        self.poll_scheduler.reschedule(feed.uri, state.interval, now)
+        self.cache.put(FeedState.cache_key(feed.uri), state.to_dict(), feed=feed.name)
 
-    def batch_requests(self, requests, session: ClientSession) -> Awaitable:
-        return asyncio.gather(*[self.serve_request(r, session) for r in requests])
+    async def fetch_feed(
+            self,
+            feed: Feed,
+            session: ClientSession,
+            priority: Priority,
+            state: FeedState) -> Tuple[bool, Optional[float]]:
+        """ Returns whether the feed changed and how long the server says it may be cached. """
+        async with self.admitted(feed.uri, priority), session.get(feed.uri, headers=state.request_headers()) as resp:
+            resp.raise_for_status()
+            if resp.status == 304:
+                changed = False
+            elif state.needs_body_comparison(resp.headers):
+                # Only the body can tell whether the feed changed, so it has to arrive in full first.
+                body = await resp.read()
+                self.gather_stats.transferred(len(body))
+                changed = state.revalidate(resp.headers, body)
+                if changed:
+                    await self.service(feed, session, priority, body, resp.charset)
+            else:
+                changed = await self.stream_feed(feed, session, priority, resp, state)
 
-    async def serve_request(self, request, session: ClientSession) -> None:
-        async with session.get(request.uri) as resp:
-            response_text = await resp.text()
-            await self.service(request, session, response_text)
+            if not changed:
+                await self.service_unchanged_feed(feed, session, priority, state)
+            return changed, max_age(resp.headers.get('Cache-Control'))
 
-    async def service(self, request: Union[Feed, Item], session: ClientSession, response_text: str) -> None:
+    async def serve_probe(
+            self,
+            feed: Feed,
+            session: ClientSession,
+            priority: Priority,
+            state: FeedState,
+            probe: Probe) -> Tuple[bool, Optional[float]]:
+        headers, body, encoding = probe
+        changed = state.revalidate(headers, body)
+        if changed:
+            await self.service(feed, session, priority, body, encoding)
+        else:
+            await self.service_unchanged_feed(feed, session, priority, state)
+        return changed, max_age(headers.get('Cache-Control'))
+
+    async def stream_feed(
+            self,
+            feed: Feed,
+            session: ClientSession,
+            priority: Priority,
+            resp: ClientResponse,
+            state: FeedState) -> bool:
+        """
+        Dispatches each entry's article request while the rest of the feed is still downloading.
+        Returns whether the feed changed.
+        """
+        parser = StreamingFeedParser()
+        chunks = []
+        async for chunk in resp.content.iter_chunked(self.chunk_size):
+            chunks.append(chunk)
+            self.gather_stats.transferred(len(chunk))
+            self.dispatch_entries(feed, session, priority, await self.parse(parser.feed, chunk), parser.versions)
+        body = b''.join(chunks)
+        self.dispatch_entries(feed, session, priority, await self.parse(parser.close, body), parser.versions)
+        self.remember_parse(feed, state, parser)
+        return state.revalidate(resp.headers, body)
+
+    async def parse(self, function: Callable[..., Any], *arguments: Any) -> Any:
+        """ On the main context, parsing on the loop would hold up drawing, so it runs on a thread there. """
+        with self.gather_stats.timed('parse'):
+            if self.main_context:
+                return await self.loop.run_in_executor(None, function, *arguments)
+            return function(*arguments)
+
+    def dispatch_entries(
+            self,
+            feed: Feed,
+            session: ClientSession,
+            priority: Priority,
+            entries: List[Entry],
+            versions: Optional[Dict[str, str]] = None) -> None:
+        """
+        Entries already dispatched or in the store are skipped, so refreshes and retries never add them twice.
+        Entries gathered by an earlier session whose article is cached go straight to the store.
+        Only new and updated entries (by GUID and date, see SeenSet) become requests.
+        """
+        entries = [entry for entry in entries if (feed.name, entry[0]) not in self.claimed]
+        self.claimed.update((feed.name, link) for link, title in entries)
+        seen = self.feed_state(feed).seen
+        new_entries = []
+        for link, title in entries:
+            version = versions.get(link) if versions else None
+            status = seen.check(link, version)
+            seen.add(link, version)
+            if status == UPDATED:
+                self.cache.put(link, None)  # The article changed, so it's fetched again
+            article = self.cache.query(link) if status == SEEN else None
+            if status == SEEN and (article is not None or not self.fetch_articles):
+                item = Item(feed.name, link, title, article=article)
+                if not self.collapse_duplicate(item):
+                    self.add_to_store(item)
+            else:
+                new_entries.append([link, title])
+        if new_entries:
+            self.batch_requests(self.entries_to_items(feed, new_entries), session, priority)
+
+    def remember_parse(self, feed: Feed, state: FeedState, parser: StreamingFeedParser) -> None:
+        """ Entries the feed no longer lists are unclaimed, so claimed only grows with the feeds themselves. """
+        listed = {link for link, title in parser.entries}
+        self.claimed.difference_update((feed.name, link) for link, title in state.entries if link not in listed)
+        state.entries = parser.entries
+        state.versions = parser.versions
+        state.hint = feed_hint(parser.hints)
+        state.hub = parser.discovery.get('hub')
+        state.topic = parser.discovery.get('self')
+
+    def feed_state(self, feed: Feed) -> FeedState:
+        try:
+            return self.feed_states[feed.uri]
+        except KeyError:
+            cached = self.cache.query(FeedState.cache_key(feed.uri))
+            state = FeedState.from_dict(cached) if cached else FeedState()
+            self.feed_states[feed.uri] = state
+            return state
+
+    async def service(
+            self,
+            request: Union[Feed, Item],
+            session: ClientSession,
+            priority: Priority,
+            body: bytes,
+            encoding: Optional[str]) -> Optional[str]:
         if isinstance(request, Feed):
-            await self.service_feed(request, session, response_text)
+            await self.service_feed(request, session, priority, body)
         elif isinstance(request, Item):
-            self.service_item(request, response_text)
+            return await self.service_item(request, body, encoding)
         else:
             raise ValueError('Unknown request sent to Gatherer.')
 
-    async def service_feed(self, feed: Feed, session: ClientSession, feed_xml: str) -> Awaitable:
-        content = feedparser.parse(feed_xml)
-        items = []
-        for entry in content['entries']:
-            items.append(
-                Item(feed.name, entry['link'], entry['title']))
-        return self.batch_requests(items, session)
+    async def service_feed(self, feed: Feed, session: ClientSession, priority: Priority, feed_xml: bytes) -> None:
+        parser = await self.parse(parse_feed, feed_xml)
+        self.remember_parse(feed, self.feed_state(feed), parser)
+        self.dispatch_entries(feed, session, priority, parser.entries, parser.versions)
 
-    def service_item(self, item: Item, html: str) -> None:
-        item.article = fulltext(html)
-        Gdk.threads_add_idle(GLib.PRIORITY_DEFAULT_IDLE, self.main_thread_add_item_to_store, (self.store, item))
+    async def service_unchanged_feed(
+            self,
+            feed: Feed,
+            session: ClientSession,
+            priority: Priority,
+            state: FeedState) -> None:
+        """ Replays the remembered entries that aren't in the store yet (e.g. after a restart). """
+        self.dispatch_entries(feed, session, priority, state.entries, state.versions)
 
     @staticmethod
-    def main_thread_add_item_to_store(arg_tuple: Tuple[NewsStore, Item]) -> bool:
-        """ Needed due to GTK thread safety """
-        store, item = arg_tuple
-        store.append(item)
-        return False  # Discard this event after we are done
+    def entries_to_items(feed: Feed, entries: List[Entry]) -> List[Item]:
+        return [Item(feed.name, link, title) for link, title in entries]
+
+    async def service_item(self, item: Item, html: bytes, encoding: Optional[str]) -> str:
+        """
+        Extraction is CPU-bound, so it runs in the extractor processes instead of this loop.
+        A page already extracted under another URI (tracking parameters, mirrors) isn't extracted again.
+        """
+        digest = hashlib.sha1(html).digest()
+        article = self.extracted.get(digest)
+        if article is None:
+            with self.gather_stats.timed('extract'):
+                article = await self.loop.run_in_executor(self.extractor, extract_article, html, encoding)
+            self.extracted[digest] = article
+            if len(self.extracted) > self.extracted_pages:
+                self.extracted.popitem(last=False)
+        else:
+            self.extracted.move_to_end(digest)
+        self.cache.put(item.uri, article, feed=item.feed_name)
+        return article
+
+    def add_to_store(self, item: Item) -> None:
+        self.hand_off(self.pending_items, item)
+
+    def update_in_store(self, item: Item) -> None:
+        """ Fills in the article of an item that is already in the store. """
+        self.hand_off(self.pending_articles, item)
+
+    def hand_off(self, pending: deque, item: Item) -> None:
+        """ Items are handed to the main thread in batches instead of one callback per item. """
+        with self.pending_lock:
+            pending.append(item)
+            if self.drain_scheduled:
+                return
+            self.drain_scheduled = True
+        if self.headless:
+            self.loop.call_soon(self.drain_all_pending)
+        elif self.main_context:  # Already on the main thread, only the time budget per frame matters
+            self.loop.call_later(self.drain_interval / 1000, self.drain_next_frame)
+        else:
+            self.add_main_thread_timeout(self.drain_interval, self.main_thread_drain_pending)
+
+    def drain_all_pending(self) -> None:
+        while self.main_thread_drain_pending():
+            pass
+
+    def drain_next_frame(self) -> None:
+        if self.main_thread_drain_pending():
+            self.loop.call_later(self.drain_interval / 1000, self.drain_next_frame)
+
+    def main_thread_drain_pending(self) -> bool:
+        """
+        Needed due to GTK thread safety. Inserts as many pending items as fit in the time budget,
+        staying scheduled for the next frame if some are left over.
+        Articles come first since the reader may be waiting on one.
+        """
+        deadline = time.perf_counter() + self.drain_budget
+        while True:
+            with self.pending_lock:
+                articles = self.take_batch(self.pending_articles)
+                batch = self.take_batch(self.pending_items)
+                if not articles and not batch:
+                    self.drain_scheduled = False
+                    return False  # Discard this event, the next item schedules a new one
+            with self.gather_stats.timed('insert'):
+                for item in articles:
+                    self.store.update_article(item)
+                self.store.extend(batch)
+            if time.perf_counter() >= deadline:
+                return True  # Continue on the next frame
+
+    def take_batch(self, pending: deque) -> List[Item]:
+        return [pending.popleft() for _ in range(min(self.drain_batch, len(pending)))]
+
+
+def main_thread_timeout() -> Optional[Callable[[int, Callable[[], bool]], Any]]:
+    """
+    Adds a timeout to the GTK main loop, or None without GTK, where items are handed off on the Gatherer's own thread.
+    Gdk is imported here rather than with this module, as importing it connects to the display. Shard processes,
+    which import this module but are always headless, never do.
+    """
+    try:
+        import gi
+        gi.require_version('Gdk', '3.0')
+        from gi.repository import Gdk, GLib
+    except (ImportError, ValueError):
+        return None
+    return lambda interval, function: Gdk.threads_add_timeout(GLib.PRIORITY_DEFAULT_IDLE, interval, function)
+
+
+def main_context_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """
+    The asyncio loop running on the GTK main context, if PyGObject provides one (3.50 and later) and
+    GLibEventLoopPolicy was installed with asyncio.set_event_loop_policy() before the application ran.
+    gi.events is imported by whoever installed it, so it's looked up rather than imported.
+    """
+    events = sys.modules.get('gi.events')
+    if events is None or not isinstance(asyncio.get_event_loop_policy(), events.GLibEventLoopPolicy):
+        return None
+    return asyncio.get_event_loop_policy().get_event_loop()
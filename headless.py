@@ -0,0 +1,145 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import argparse
+import json
+import sys
+import time
+from threading import Lock
+from typing import Iterable, List, Optional, TextIO
+
+from cache import Cache
+from feed import Feed
+from gatherer import Gatherer
+from item import Item
+from opml import read_opml, write_opml
+from preferences import Preferences
+from shardedGatherer import create_gatherer
+from sqliteCache import SqliteCache
+
+
+class JsonLinesStore:
+    """ Takes the NewsStore's place without GTK, optionally writing each item as a line of JSON. """
+
+    def __init__(self, out: Optional[TextIO] = None):
+        self.out = out
+        self.count = 0
+        self.lock = Lock()
+
+    def append(self, item: Item) -> None:
+        self.extend([item])
+
+    def extend(self, items: Iterable[Item]) -> None:
+        with self.lock:
+            for item in items:
+                self.count += 1
+                self.write(vars(item))
+            self.flush()
+
+    def update_article(self, item: Item) -> None:
+        """ The item was counted and written already, the new line is marked as an update of it. """
+        with self.lock:
+            self.write(dict(vars(item), update=True))
+            self.flush()
+
+    def write(self, record: dict) -> None:
+        if self.out is not None:
+            self.out.write(json.dumps(record) + '\n')
+
+    def flush(self) -> None:
+        if self.out is not None:
+            self.out.flush()
+
+    def clear(self) -> None:
+        self.count = 0
+
+
+def refresh(preferences: Preferences, cache: Cache, out: Optional[TextIO], fetch_articles: bool) -> int:
+    """ Gathers every feed once with the same pipeline the GUI uses. Returns the number of items gathered. """
+    store = JsonLinesStore(out)
+    gatherer = create_gatherer(store, cache, preferences.network_preferences(), fetch_articles, headless=True)
+    try:
+        gatherer.refresh(preferences.feed_list()).result()
+        stats = gatherer.stats()
+    finally:
+        gatherer.stop()
+    failed = sum(outcomes.get('failed', 0) for outcomes in stats['hosts'].values())
+    print('Gathered {} items from {} feeds ({:.1f} MB, {} failed requests)'.format(
+        store.count, len(preferences.feed_list()), stats['bytes'] / 1e6, failed), file=sys.stderr)
+    return store.count
+
+
+def import_feeds(preferences: Preferences, path: str) -> int:
+    """ Adds the feeds of an OPML file that can be reached and parsed, in one write. Returns how many were added. """
+    with open(path, 'rb') as f:
+        feeds = read_opml(f.read(), preferences.feed_list())
+    checked = 0
+
+    def progress(feed: Feed, valid: bool) -> None:
+        nonlocal checked
+        checked += 1
+        print('[{}/{}] {} {}'.format(checked, len(feeds), 'ok    ' if valid else 'failed', feed.uri), file=sys.stderr)
+
+    gatherer = Gatherer(JsonLinesStore(), Cache(), preferences.network_preferences(), headless=True)
+    try:
+        valid_feeds = gatherer.validate(feeds, progress).result()
+    finally:
+        gatherer.stop()
+    preferences.add_feeds(valid_feeds)
+    print('Imported {} of {} new feeds'.format(len(valid_feeds), len(feeds)), file=sys.stderr)
+    return len(valid_feeds)
+
+
+def export_feeds(preferences: Preferences, path: str) -> None:
+    with open(path, 'wb') as f:
+        f.write(write_opml(preferences.feed_list()))
+
+
+def main(arguments: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog='trough.py --headless', description='Run Trough without a display.')
+    parser.add_argument('command', choices=['refresh', 'import', 'export'], help=(
+        'refresh: gather every feed into the cache once, '
+        'import: add the feeds of an OPML file that work, export: write the feeds to an OPML file'))
+    parser.add_argument('path', nargs='?', help='the OPML file to import or export')
+    parser.add_argument('--jsonl', action='store_true', help='write each gathered item to stdout as JSON')
+    parser.add_argument('--headlines-only', action='store_true', help="don't fetch articles, only feeds")
+    parser.add_argument('--sqlite-cache', action='store_true', help='keep the cache in an SQLite database')
+    args = parser.parse_args(arguments)
+
+    preferences = Preferences(load_from_file=True)
+    if args.command in ('import', 'export'):
+        if args.path is None:
+            parser.error(args.command + ' needs the path of an OPML file')
+        if args.command == 'import':
+            import_feeds(preferences, args.path)
+        else:
+            export_feeds(preferences, args.path)
+        return 0
+
+    cache = SqliteCache(load_from_file=True) if args.sqlite_cache else Cache(load_from_file=True)
+    start = time.perf_counter()
+    refresh(preferences, cache, sys.stdout if args.jsonl else None, not args.headlines_only)
+    cache.write_cache()
+    print('Refreshed in {:.2f}s'.format(time.perf_counter() - start), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,151 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import asyncio
+from collections import Counter, OrderedDict, deque
+from enum import IntEnum
+from threading import Lock
+from typing import Dict
+from urllib.parse import urlsplit
+
+
+class Priority(IntEnum):
+    """ Lower values are admitted first. """
+    INTERACTIVE = 0  # Feeds or items the user just added or selected
+    FOREGROUND = 1  # A refresh the user asked for
+    BACKGROUND = 2  # Polls and prefetches nobody is waiting on
+
+
+class HostLimiter:
+    """
+    Admits requests before they reach the connection pool.
+    Waiting requests are admitted by priority, and round-robin across hosts within a priority,
+    so a host with a long backlog can't starve the others and background work never delays the user.
+    Background work may only hold part of the slots, the rest stay free for whatever the user asks for next.
+    """
+    background_share = 0.5
+
+    def __init__(self, per_host: int, limit: int):
+        self.per_host = max(1, per_host)
+        self.limit = max(1, limit)
+        self.background_limit = max(1, int(self.limit * self.background_share))
+        self.queues = [OrderedDict() for _ in Priority]  # Priority -> host -> deque of waiting futures
+        self.admitted = 0
+        self.admitted_background = 0
+        self.active = Counter()  # Host -> requests holding a slot
+        self.waiting = Counter()  # Host -> requests waiting for a slot
+        self.lock = Lock()  # Counters are read from other threads
+
+    @staticmethod
+    def host_of(uri: str) -> str:
+        return urlsplit(uri).hostname or ''
+
+    def slot(self, uri: str, priority: Priority = Priority.FOREGROUND) -> 'HostSlot':
+        return HostSlot(self, self.host_of(uri), priority)
+
+    def can_admit(self, host: str, priority: Priority) -> bool:
+        if self.admitted >= self.limit or self.active[host] >= self.per_host:
+            return False
+        return priority != Priority.BACKGROUND or self.admitted_background < self.background_limit
+
+    async def acquire(self, host: str, priority: Priority) -> None:
+        if self.can_admit(host, priority) and not any(self.queues[p].get(host) for p in Priority if p <= priority):
+            self.admit(host, priority)
+            return
+
+        waiter = asyncio.get_event_loop().create_future()
+        self.queues[priority].setdefault(host, deque()).append(waiter)
+        self.count(self.waiting, host, 1)
+        try:
+            await waiter  # Resolved by wake(), which also admits it
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(host, priority)  # Admitted just as it was cancelled
+            else:
+                self.forget(waiter, host, priority)
+            raise
+
+    def release(self, host: str, priority: Priority) -> None:
+        self.admitted -= 1
+        if priority == Priority.BACKGROUND:
+            self.admitted_background -= 1
+        self.count(self.active, host, -1)
+        self.wake()
+
+    def admit(self, host: str, priority: Priority) -> None:
+        self.admitted += 1
+        if priority == Priority.BACKGROUND:
+            self.admitted_background += 1
+        self.count(self.active, host, 1)
+
+    def wake(self) -> None:
+        """ Admit waiting requests, most important first, until nothing else fits. """
+        for priority in Priority:
+            queues = self.queues[priority]
+            admitted_any = True
+            while admitted_any and self.admitted < self.limit:
+                admitted_any = False
+                for host in list(queues):
+                    if not self.can_admit(host, priority):
+                        continue
+                    waiter = queues[host].popleft()
+                    if not queues[host]:
+                        del queues[host]
+                    else:
+                        queues.move_to_end(host)  # Round-robin between hosts
+                    self.count(self.waiting, host, -1)
+                    self.admit(host, priority)
+                    waiter.set_result(None)
+                    admitted_any = True
+                    break
+
+    def forget(self, waiter: asyncio.Future, host: str, priority: Priority) -> None:
+        queue = self.queues[priority].get(host)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self.queues[priority][host]
+            self.count(self.waiting, host, -1)
+
+    def count(self, counter: Counter, host: str, delta: int) -> None:
+        with self.lock:
+            counter[host] += delta
+            if counter[host] <= 0:
+                del counter[host]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self.lock:
+            return {'active': dict(self.active), 'waiting': dict(self.waiting)}
+
+
+class HostSlot:
+    """ async with limiter.slot(uri, priority): ... """
+
+    def __init__(self, limiter: HostLimiter, host: str, priority: Priority):
+        self.limiter = limiter
+        self.host = host
+        self.priority = priority
+
+    async def __aenter__(self) -> 'HostSlot':
+        await self.limiter.acquire(self.host, self.priority)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.limiter.release(self.host, self.priority)
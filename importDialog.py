@@ -0,0 +1,84 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+
+from concurrent.futures import Future
+from typing import Any, List
+
+from gi import require_version
+
+require_version('Gtk', '3.0')
+from gi.repository import GLib, Gtk
+
+from feed import Feed
+
+
+class ImportDialog(Gtk.Dialog):
+    """ Checks the feeds being imported all at once through the Gatherer, showing how far along it is. """
+
+    def __init__(self, parent: Gtk.Widget, gatherer: Any, feeds: List[Feed]):
+        Gtk.Dialog.__init__(self, 'Import Feeds', parent, 0, (Gtk.STOCK_CANCEL, Gtk.ResponseType.CANCEL))
+        self.set_default_size(300, 80)
+        self.feeds = feeds
+        self.checked = 0
+        self.failed = list()  # Feeds that couldn't be reached or parsed
+        self.closed = False  # Checks finishing after the dialog is gone are ignored
+
+        self.progress_bar = Gtk.ProgressBar(show_text=True)
+        self.update_progress()
+        box = self.get_content_area()
+        box.add(self.progress_bar)
+        box.show_all()
+
+        self.validation = gatherer.validate(feeds, self.on_feed_checked)
+        self.validation.add_done_callback(lambda done: GLib.idle_add(self.on_validated, done))
+
+    def get_response(self) -> List[Feed]:
+        """ Primary external call. Returns the feeds that work, or none if the import was cancelled. """
+        valid = list()
+        if self.run() == Gtk.ResponseType.OK:
+            valid = self.validation.result()
+        else:
+            self.validation.cancel()
+        self.closed = True
+        self.destroy()
+        return valid
+
+    def on_feed_checked(self, feed: Feed, valid: bool) -> None:
+        """ Called on the Gatherer's thread. """
+        GLib.idle_add(self.feed_checked, feed, valid)
+
+    def feed_checked(self, feed: Feed, valid: bool) -> bool:
+        if not self.closed:
+            self.checked += 1
+            if not valid:
+                self.failed.append(feed)
+            self.update_progress()
+        return False  # Don't repeat
+
+    def update_progress(self) -> None:
+        self.progress_bar.set_fraction(self.checked / len(self.feeds) if self.feeds else 1.0)
+        self.progress_bar.set_text('{} of {} feeds checked, {} failed'.format(
+            self.checked, len(self.feeds), len(self.failed)))
+
+    def on_validated(self, validation: Future) -> bool:
+        if not self.closed and not validation.cancelled():
+            self.response(Gtk.ResponseType.OK)
+        return False
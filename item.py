@@ -25,7 +25,8 @@ class Item:
     """ An RSS item """
 
     def __init__(self, feed_name: str, uri: str, title: str = '', description: str = '', article: str = None):
-        self.feed_name = feed_name
+        self.feed_name = feed_name  # Shown, lists every feed of a syndicated item
+        self.feeds = [feed_name]
         self.uri = uri
         self.title = title
         self.description = description
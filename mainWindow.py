@@ -27,11 +27,13 @@ from gi.repository import Gdk, GLib, Gtk
 
 from cache import Cache
 from feedDialog import FeedDialog
-from gatherer import Gatherer
+from hostLimiter import Priority
 from newsStore import NewsStore
 from newsView import NewsView
 from preferences import Preferences
 from preferencesWindow import PreferencesWindow
+from shardedGatherer import create_gatherer
+from statusBar import StatusBar
 from stubGatherer import StubGatherer
 from threePaneView import ThreePaneView
 from twoPaneView import TwoPaneView
@@ -48,13 +50,20 @@ class MainWindow(Gtk.Window):
         self.cache = cache
 
         self.news_store = NewsStore()
-        # self.gatherer = StubGatherer(self.news_store)
-        self.gatherer = Gatherer(self.news_store)
+        # self.gatherer = StubGatherer(self.news_store, self.cache, self.preferences.network_preferences())
+        self.gatherer = create_gatherer(
+            self.news_store,
+            self.cache,
+            self.preferences.network_preferences(),
+            fetch_articles=False,  # Articles are fetched as the reader nears them
+            main_context=True)  # Only takes effect when trough.py was started with --glib-loop
+        self.gatherer.schedule(self.preferences.feed_list())
 
         self.connect_signals()
         self.prepare_appearance()
 
         self.css_provider = self.create_css()
+        self.body = self.create_body()
         self.current_view = None
         self.switch_view(self.news_store, self.preferences)
 
@@ -111,13 +120,23 @@ class MainWindow(Gtk.Window):
                 self.current_view.destroy_display()
 
             self.current_view = view_class(news_store, appearance_prefs)
-            self.add(self.current_view.top_level())
+            self.current_view.set_reading_listener(
+                self.gatherer.read,
+                preferences.network_preferences()['Prefetched Articles'])
+            self.body.pack_start(self.current_view.top_level(), True, True, 0)
             self.show_all()
 
             self.get_preferred_size()  # TODO: Investigate if still needed.
 
         return self.current_view
 
+    def create_body(self) -> Gtk.Box:
+        """ Holds the current view above the status bar. """
+        body = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        body.pack_end(StatusBar(self.gatherer.stats), False, False, 0)
+        self.add(body)
+        return body
+
     def create_css(self) -> Gtk.CssProvider:
         css_provider = Gtk.CssProvider()
         css_provider.load_from_data(self.preferences.get_appearance_css())
@@ -166,18 +185,20 @@ class MainWindow(Gtk.Window):
         return refresh_button
 
     def on_add_clicked(self, widget: Gtk.Widget = None) -> None:
-        dialog = FeedDialog(self, self.preferences.feeds())
+        dialog = FeedDialog(self, self.preferences.feeds(), gatherer=self.gatherer)
         feed = dialog.get_response()
 
         if feed:
             self.preferences.add_feed(feed)
-            self.on_refresh_clicked()  # Do a convenience refresh
+            self.gatherer.schedule(self.preferences.feed_list())
+            self.gatherer.request(feed, Priority.INTERACTIVE)  # Show the new feed right away
 
     def on_preferences_clicked(self, widget: Gtk.Widget = None) -> None:
         pw = PreferencesWindow(self, self.preferences, self.cache)
         response = pw.run()
         if response == Gtk.ResponseType.OK:
             pw.apply_choices()
+            self.gatherer.schedule(self.preferences.feed_list())
         pw.destroy()
 
     def on_refresh_clicked(self, widget: Gtk.Widget = None) -> None:
@@ -190,8 +211,7 @@ class MainWindow(Gtk.Window):
         self.news_store.clear()
         self.gatherer.request(None)
         '''
-        for feed in self.preferences.feeds().values():
-            self.gatherer.request(feed)
+        self.gatherer.refresh(self.preferences.feed_list())
 
     @staticmethod
     def do_scroll(widget: Gtk.Widget, scroll: Gtk.ScrollType) -> None:
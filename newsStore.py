@@ -18,7 +18,7 @@
     Trough homepage: https://github.com/glu10/trough
 """
 
-from typing import List
+from typing import Iterable, List
 
 import gi
 
@@ -31,7 +31,11 @@ from item import Item
 class NewsStore:
     """ A centralized data repository of all viewable fetched content. """
 
+    feed_column = 0
+    article_column = 4
+
     def __init__(self):
+        self.rows = dict()  # Item URI -> Gtk.TreeIters of its rows, ListStore iters stay valid
         self.store = Gtk.ListStore(
             str,  # Feed Name
             str,  # Item URI
@@ -40,13 +44,23 @@ class NewsStore:
             str, )  # Item Article
 
     def append(self, item: Item) -> None:
-        self.store.append([
+        it = self.store.append([
             item.feed_name,
             item.uri,
             item.title,
             item.description,
             item.article
         ])
+        self.rows.setdefault(item.uri, []).append(it)
+
+    def extend(self, items: Iterable[Item]) -> None:
+        for item in items:
+            self.append(item)
+
+    def update_article(self, item: Item) -> None:
+        """ Also updates the feed name, which lists every feed of an item that near-duplicates were collapsed into. """
+        for it in self.rows.get(item.uri, []):
+            self.store.set(it, {self.feed_column: item.feed_name, self.article_column: item.article})
 
     @staticmethod
     def row_to_item(row: List[str]) -> Item:
@@ -57,3 +71,4 @@ class NewsStore:
 
     def clear(self) -> None:
         self.store.clear()
+        self.rows.clear()
@@ -25,8 +25,9 @@ from gi.repository import Gtk
 
 from abc import ABCMeta, abstractmethod
 from webbrowser import open_new_tab
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional
 
+from item import Item
 from newsStore import NewsStore
 
 
@@ -37,6 +38,15 @@ class NewsView(metaclass=ABCMeta):
         self.last_item_index = -1
         self.last_item_feed_name = None
         self.content_view = None
+        self.reading_listener = None  # Told which item is being read and which ones come next
+        self.prefetch_distance = 0
+
+    def set_reading_listener(self, listener: Optional[Callable[[Item, List[Item]], None]], distance: int) -> None:
+        """
+        Whenever an item is shown, listener is called with it and the next distance items in reading direction.
+        """
+        self.reading_listener = listener
+        self.prefetch_distance = distance
 
     def appearance(self) -> Dict[str, str]:
         return self.appearance_preferences
@@ -0,0 +1,69 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+
+from typing import Iterable, List
+
+from lxml import etree
+
+from feed import Feed
+
+
+def read_opml(data: bytes, existing: Iterable[Feed] = ()) -> List[Feed]:
+    """
+    The feeds of an OPML subscription list, at any depth of nesting, leaving out those already in existing.
+    Names are made unique, as Feeds are told apart by name, and repeated URIs are dropped.
+    """
+    parser = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=True, recover=True)
+    try:
+        root = etree.fromstring(data, parser)
+    except etree.XMLSyntaxError as e:
+        raise ValueError('Not an OPML file: ' + str(e)) from e
+    if root is None or root.tag != 'opml':
+        raise ValueError('Not an OPML file.')
+
+    feeds = []
+    existing = list(existing)
+    names = {feed.name for feed in existing}
+    uris = {feed.uri for feed in existing}
+    for outline in root.iter('outline'):
+        uri = (outline.get('xmlUrl') or '').strip()
+        if not uri or uri in uris:
+            continue  # A category, or already listed in another one
+        name = (outline.get('title') or outline.get('text') or uri).strip()
+        unique_name = name
+        copy_number = 2
+        while unique_name in names:
+            unique_name = '{} ({})'.format(name, copy_number)
+            copy_number += 1
+        names.add(unique_name)
+        uris.add(uri)
+        feeds.append(Feed(unique_name, uri))
+    return feeds
+
+
+def write_opml(feeds: Iterable[Feed]) -> bytes:
+    root = etree.Element('opml', version='2.0')
+    head = etree.SubElement(root, 'head')
+    etree.SubElement(head, 'title').text = 'Trough Subscriptions'
+    body = etree.SubElement(root, 'body')
+    for feed in feeds:
+        etree.SubElement(body, 'outline', type='rss', text=feed.name, title=feed.name, xmlUrl=feed.uri)
+    return etree.tostring(root, xml_declaration=True, encoding='utf-8', pretty_print=True)
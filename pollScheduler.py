@@ -0,0 +1,114 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import random
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from feed import Feed
+
+MIN_INTERVAL = 5 * 60  # Seconds
+DEFAULT_INTERVAL = 30 * 60
+MAX_INTERVAL = 24 * 60 * 60
+PUSHED_INTERVAL = 6 * 60 * 60  # Fallback for feeds whose updates a WebSub hub pushes
+
+update_periods = {
+    'hourly': 60 * 60,
+    'daily': 24 * 60 * 60,
+    'weekly': 7 * 24 * 60 * 60,
+    'monthly': 30 * 24 * 60 * 60,
+    'yearly': 365 * 24 * 60 * 60,
+}
+
+
+def feed_hint(hints: Dict[str, str]) -> Optional[float]:
+    """ Seconds between polls asked for by a feed's <ttl> or sy:updatePeriod/sy:updateFrequency. """
+    intervals = []
+    try:
+        intervals.append(float(hints['ttl']) * 60)  # Minutes
+    except (KeyError, ValueError):
+        pass
+
+    period = update_periods.get(hints.get('updatePeriod', '').lower())
+    if period:
+        try:
+            frequency = max(1.0, float(hints.get('updateFrequency', 1)))
+        except ValueError:
+            frequency = 1.0
+        intervals.append(period / frequency)
+    return max(intervals) if intervals else None
+
+
+def max_age(cache_control: Optional[str]) -> Optional[float]:
+    """ Seconds the response may be reused for, per its Cache-Control header. """
+    if cache_control:
+        match = re.search(r'max-age\s*=\s*"?(\d+)', cache_control)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def next_interval(interval: Optional[float], changed: bool, *hints: Optional[float]) -> float:
+    """
+    Halves the interval of a feed that changed and doubles it for one that didn't.
+    Never polls more often than the publisher asks for.
+    """
+    interval = interval or DEFAULT_INTERVAL
+    interval = interval / 2 if changed else interval * 2
+    floor = max([MIN_INTERVAL] + [hint for hint in hints if hint])
+    return min(max(interval, floor), max(MAX_INTERVAL, floor))
+
+
+class PollScheduler:
+    """ Keeps track of when each feed is due for a background poll. """
+    jitter = 0.1  # Fraction an interval is randomly stretched or shrunk by, to keep feeds from lining up
+
+    def __init__(self, rng: Callable[[], float] = random.random):
+        self.rng = rng
+        self.feeds = dict()  # Feed URI -> Feed
+        self.intervals = dict()  # Feed URI -> seconds between polls
+        self.due = dict()  # Feed URI -> time of the next poll
+
+    def set_feeds(self, feeds: Iterable[Tuple[Feed, Optional[float]]], now: float) -> None:
+        """ Feeds not seen before get their first poll at a random point within their interval. """
+        feeds = list(feeds)
+        self.feeds = {feed.uri: feed for feed, interval in feeds}
+        self.intervals = {feed.uri: interval or DEFAULT_INTERVAL for feed, interval in feeds}
+        self.due = {uri: self.due.get(uri, now + self.rng() * self.intervals[uri]) for uri in self.feeds}
+
+    def reschedule(self, uri: str, interval: float, now: float) -> None:
+        if uri in self.feeds:
+            self.intervals[uri] = interval
+            self.due[uri] = now + self.jittered(interval)
+
+    def due_feeds(self, now: float) -> List[Feed]:
+        """ Feeds that should be polled now. They are pushed back a whole interval in case the poll fails. """
+        due = [uri for uri, when in self.due.items() if when <= now]
+        for uri in due:
+            self.due[uri] = now + self.jittered(self.intervals[uri])
+        return [self.feeds[uri] for uri in due]
+
+    def seconds_until_next(self, now: float) -> Optional[float]:
+        if not self.due:
+            return None
+        return max(0.0, min(self.due.values()) - now)
+
+    def jittered(self, interval: float) -> float:
+        return interval * (1 + self.jitter * (2 * self.rng() - 1))
@@ -20,15 +20,17 @@
 
 import copy
 import os
-from typing import Dict, List, Optional, Union
-
-from gi import require_version
-require_version('Gtk', '3.0')
-from gi.repository import Gio, Gtk
+from typing import Dict, Iterable, List, Optional, Union
 
+try:
+    from gi import require_version
+    require_version('Gtk', '3.0')
+    from gi.repository import Gio
+except (ImportError, ValueError):  # Running headless, without GTK
+    Gio = None
 
 from feed import Feed
-from utilityFunctions import ensured_read_json_file, write_json_file
+from fileOperations import ensured_read_json_file, write_json_file
 
 
 # FIXME: Refactor nested preferences dict to member variables
@@ -50,18 +52,20 @@ class Preferences:
         preferences = {
             'Appearance': Preferences.default_appearance_preferences(),
             'Feeds': Preferences.default_feeds_preferences(),
+            'Network': Preferences.default_network_preferences(),
         }
         return preferences
 
     @staticmethod
     def default_appearance_preferences() -> Dict[str, str]:
-        gs = Gio.Settings('org.gnome.desktop.interface')
-        default_font = gs.get_string('font-name')
-        document_font = gs.get_string('document-font-name')
-        if not default_font and document_font:
-            default_font = document_font
-        elif not document_font and default_font:
-            document_font = default_font
+        if Gio is not None:
+            gs = Gio.Settings('org.gnome.desktop.interface')
+            default_font = gs.get_string('font-name')
+            document_font = gs.get_string('document-font-name')
+            if not default_font and document_font:
+                default_font = document_font
+            elif not document_font and default_font:
+                document_font = default_font
 
         return {
             'View': 'Three-Pane',
@@ -79,12 +83,32 @@ class Preferences:
     def default_feeds_preferences() -> Dict[str, Feed]:
         return dict()
 
+    @staticmethod
+    def default_network_preferences() -> Dict[str, Union[int, str]]:
+        return {
+            'Connection Limit': 100,  # Simultaneous connections overall
+            'Per-Host Connection Limit': 6,  # Simultaneous connections to a single host
+            'Keep-Alive Timeout': 15,  # Seconds an idle connection is kept for reuse
+            'DNS Cache TTL': 300,  # Seconds a DNS lookup is reused
+            'Connect Timeout': 10,  # Seconds to establish a connection
+            'First Byte Timeout': 30,  # Seconds a response may go without sending anything
+            'Total Timeout': 120,  # Seconds a single download may take overall
+            'Gathering Processes': 1,  # Processes feeds are spread over, more than 1 helps with thousands of feeds
+            'Extraction Workers': 0,  # Processes extracting articles, 0 picks a count from the number of cores
+            'Prefetched Articles': 5,  # Articles fetched ahead of the one being read
+            'Push Callback URL': '',  # Where WebSub hubs can reach Trough, push updates are off without one
+            'Push Port': 8090,  # Port pushed updates are received on
+        }
+
     def appearance_preferences(self) -> Dict[str, str]:
         return self.preferences['Appearance']
 
     def feeds_preferences(self) -> Dict[str, Feed]:
         return self.preferences['Feeds']
 
+    def network_preferences(self) -> Dict[str, Union[int, str]]:
+        return self.preferences['Network']
+
     def load_preferences(self) -> None:
         self.preferences = ensured_read_json_file(
                 self.preferences_directory,
@@ -99,6 +123,11 @@ class Preferences:
                 feed_object_dict[feed_name] = Feed.from_dict(feed_attributes)
             self.preferences['Feeds'] = feed_object_dict
 
+        # Preference files written by older versions lack newer settings.
+        network = self.default_network_preferences()
+        network.update(self.preferences.get('Network', dict()))
+        self.preferences['Network'] = network
+
     def feeds(self) -> dict:
         return self.preferences['Feeds']
 
@@ -112,7 +141,12 @@ class Preferences:
             return None
 
     def add_feed(self, feed: Feed) -> None:
-        self.preferences['Feeds'][feed.name] = feed
+        self.add_feeds([feed])
+
+    def add_feeds(self, feeds: Iterable[Feed]) -> None:
+        """ Any number of feeds for a single write of the preferences file. """
+        for feed in feeds:
+            self.preferences['Feeds'][feed.name] = feed
         self.update_preferences(self.preferences)
 
     def write_preferences(self) -> None:
@@ -29,6 +29,8 @@ from gi.repository import Gdk, Gtk
 from cache import Cache
 from feed import Feed
 from feedDialog import FeedDialog
+from importDialog import ImportDialog
+from opml import read_opml, write_opml
 from preferences import Preferences
 import utilityFunctions
 
@@ -248,6 +250,96 @@ class AppearancePreferences(PreferencesCategory):
                 cb.set_rgba(utilityFunctions.string_to_RGBA(self.choices[ci]))
 
 
+class NetworkPreferences(PreferencesCategory):
+    """
+    Connections
+     - Connection Limit
+     - Per-Host Connection Limit
+     - Keep-Alive Timeout
+     - DNS Cache TTL
+     - Gathering Processes
+    Timeouts
+     - Connect Timeout
+     - First Byte Timeout
+     - Total Timeout
+    Articles
+     - Extraction Workers
+     - Prefetched Articles
+    Push
+     - Push Callback URL
+     - Push Port
+    """
+
+    def __init__(self, parent: Any, preferences: Dict[str, Any]):
+        super().__init__(preferences, 'Network')
+        self.parent = parent
+
+        self.connection_idents = [
+            'Connection Limit',
+            'Per-Host Connection Limit',
+            'Keep-Alive Timeout',
+            'DNS Cache TTL',
+            'Gathering Processes',
+        ]
+        self.connection_buttons = [self.spin_button(i) for i in self.connection_idents]
+
+        self.timeout_idents = ['Connect Timeout', 'First Byte Timeout', 'Total Timeout']
+        self.timeout_buttons = [self.spin_button(i) for i in self.timeout_idents]
+
+        self.article_idents = ['Extraction Workers', 'Prefetched Articles']
+        self.article_buttons = [self.spin_button(i, lower=0) for i in self.article_idents]
+
+        self.push_idents = ['Push Callback URL', 'Push Port']
+        self.push_buttons = [self.text_entry('Push Callback URL'), self.spin_button('Push Port', upper=65535)]
+
+    def create_display_area(self) -> Gtk.Alignment:
+        top_vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
+
+        connection_section = self.create_section(
+            'Connections',
+            self.create_section_options(self.connection_idents, self.connection_buttons))
+        top_vbox.add(connection_section)
+
+        timeout_section = self.create_section(
+            'Timeouts',
+            self.create_section_options(self.timeout_idents, self.timeout_buttons))
+        top_vbox.add(timeout_section)
+
+        article_section = self.create_section(
+            'Articles',
+            self.create_section_options(self.article_idents, self.article_buttons))
+        top_vbox.add(article_section)
+
+        push_section = self.create_section(
+            'Push',
+            self.create_section_options(self.push_idents, self.push_buttons))
+        top_vbox.add(push_section)
+
+        helpful_label = Gtk.Label('Network changes take effect the next time Trough starts. '
+                                  'Feeds with a WebSub hub are pushed to the callback URL, if hubs can reach it.')
+        helpful_label.set_line_wrap(True)
+        top_vbox.add(helpful_label)
+
+        return self.surround_with_padding(top_vbox)
+
+    def spin_button(self, name: str, lower: int = 1, upper: int = 10000) -> Gtk.SpinButton:
+        adjustment = Gtk.Adjustment(value=self.choices[name], lower=lower, upper=upper, step_increment=1)
+        sb = Gtk.SpinButton(adjustment=adjustment, numeric=True)
+        sb.connect('value-changed', self.spin_switched, name)
+        return sb
+
+    def spin_switched(self, sb: Gtk.SpinButton, name: str) -> None:
+        self.choices[name] = sb.get_value_as_int()
+
+    def text_entry(self, name: str) -> Gtk.Entry:
+        entry = Gtk.Entry(text=self.choices[name])
+        entry.connect('changed', self.text_switched, name)
+        return entry
+
+    def text_switched(self, entry: Gtk.Entry, name: str) -> None:
+        self.choices[name] = entry.get_text().strip()
+
+
 class FeedsPreferences(PreferencesCategory):
     """
     Displays feeds and allows for editing of the list and feed information.
@@ -255,9 +347,10 @@ class FeedsPreferences(PreferencesCategory):
     how to catch/verify changes.
     """
 
-    def __init__(self, parent, preferences: Dict[str, Any], cache: Cache):
+    def __init__(self, parent, preferences: Dict[str, Any], cache: Cache, gatherer: Any):
         super().__init__(preferences, 'Feeds')
         self.parent = parent
+        self.gatherer = gatherer  # only used for checking added and imported feeds
         self.preferences = preferences
         self.info_box, self.info_scroll = self.info_placeholder()
         self.feed_list = Gtk.ListStore(str, str)
@@ -289,10 +382,24 @@ class FeedsPreferences(PreferencesCategory):
             signal_func=self.clear_cache)
         clear_cache_button.set_label('Clear cache')
 
+        import_button = utilityFunctions.make_button(
+            tooltip='Add the feeds of an OPML file',
+            signal='clicked',
+            signal_func=self.import_feeds)
+        import_button.set_label('Import')
+
+        export_button = utilityFunctions.make_button(
+            tooltip='Save the feeds to an OPML file',
+            signal='clicked',
+            signal_func=self.export_feeds)
+        export_button.set_label('Export')
+
         button_hbox = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
         button_hbox.pack_start(remove_button, False, False, 0)
         button_hbox.pack_start(add_button, False, False, 0)
         button_hbox.pack_start(edit_button, False, False, 0)
+        button_hbox.pack_start(import_button, False, False, 0)
+        button_hbox.pack_start(export_button, False, False, 0)
         button_hbox.pack_end(clear_cache_button, False, False, 0)
 
         # List of Feeds
@@ -405,7 +512,7 @@ class FeedsPreferences(PreferencesCategory):
         """
         Note: Change only appears when preferences are saved.
         """
-        dialog = FeedDialog(self.parent, feed_container=self.feed_list)
+        dialog = FeedDialog(self.parent, feed_container=self.feed_list, gatherer=self.gatherer)
         feed = dialog.get_response()
         if feed:
             self.find_and_remove_feed(feed)  # Prevents duplicate names
@@ -420,13 +527,66 @@ class FeedsPreferences(PreferencesCategory):
             name = model[it][0]
             uri = model[it][1]
 
-            dialog = FeedDialog(self.parent, feed_container=self.feed_list, feed=Feed(name, uri))
+            dialog = FeedDialog(
+                self.parent, feed_container=self.feed_list, feed=Feed(name, uri), gatherer=self.gatherer)
             feed = dialog.get_response()
             if feed:
                 model[it][0] = feed.name
                 model[it][1] = feed.uri
                 self.feed_selected(selection)
 
+    def import_feeds(self, button: Gtk.Button) -> None:
+        """
+        Only feeds that can be reached and parsed are added.
+        Note: Like added feeds, imported ones are only saved with the rest of the preferences.
+        """
+        path = self.choose_opml_file('Import Feeds', Gtk.FileChooserAction.OPEN, Gtk.STOCK_OPEN)
+        if path is None:
+            return
+        try:
+            with open(path, 'rb') as f:
+                feeds = read_opml(f.read(), self.gather_choices().values())
+        except (OSError, ValueError) as e:
+            utilityFunctions.warning_popup(self.parent, 'Could not import feeds', str(e))
+            return
+
+        dialog = ImportDialog(self.parent, self.gatherer, feeds)
+        for feed in dialog.get_response():
+            self.feed_list.append(feed.to_value_list())
+        if dialog.failed:
+            shown = 10
+            uris = [feed.uri for feed in dialog.failed[:shown]]
+            if len(dialog.failed) > shown:
+                uris.append('and {} more'.format(len(dialog.failed) - shown))
+            utilityFunctions.warning_popup(
+                self.parent,
+                '{} feeds were left out'.format(len(dialog.failed)),
+                'They could not be reached or did not contain a valid RSS feed:\n' + '\n'.join(uris))
+
+    def export_feeds(self, button: Gtk.Button) -> None:
+        path = self.choose_opml_file('Export Feeds', Gtk.FileChooserAction.SAVE, Gtk.STOCK_SAVE)
+        if path is not None:
+            try:
+                with open(path, 'wb') as f:
+                    f.write(write_opml(self.gather_choices().values()))
+            except OSError as e:
+                utilityFunctions.warning_popup(self.parent, 'Could not export feeds', str(e))
+
+    def choose_opml_file(self, title: str, action: Gtk.FileChooserAction, accept: str) -> Union[str, None]:
+        chooser = Gtk.FileChooserDialog(title, self.parent, action, (Gtk.STOCK_CANCEL, Gtk.ResponseType.CANCEL,
+                                                                     accept, Gtk.ResponseType.OK))
+        chooser.set_do_overwrite_confirmation(True)
+        if action == Gtk.FileChooserAction.SAVE:
+            chooser.set_current_name('feeds.opml')
+        opml_filter = Gtk.FileFilter()
+        opml_filter.set_name('OPML files')
+        opml_filter.add_pattern('*.opml')
+        opml_filter.add_pattern('*.xml')
+        chooser.add_filter(opml_filter)
+        path = chooser.get_filename() if chooser.run() == Gtk.ResponseType.OK else None
+        chooser.destroy()
+        return path
+
     def find_and_remove_feed(self, feed: Feed) -> None:
         for i, row in enumerate(self.feed_list):
             if feed.name == row[0]:
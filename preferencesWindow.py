@@ -27,7 +27,7 @@ from gi.repository import Gtk
 
 from cache import Cache
 from preferences import Preferences
-from preferencesCategories import AppearancePreferences, FeedsPreferences
+from preferencesCategories import AppearancePreferences, FeedsPreferences, NetworkPreferences
 
 
 class PreferencesWindow(Gtk.Dialog):
@@ -49,7 +49,8 @@ class PreferencesWindow(Gtk.Dialog):
 
         self.preferences_categories = [
             AppearancePreferences(self, self.preferences),
-            FeedsPreferences(self, self.preferences, cache),
+            FeedsPreferences(self, self.preferences, cache, parent.gatherer),
+            NetworkPreferences(self, self.preferences),
         ]
 
         self.notebook = Gtk.Notebook()
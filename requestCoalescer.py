@@ -0,0 +1,83 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable
+from urllib.parse import urlsplit, urlunsplit
+
+default_ports = {'http': 80, 'https': 443}
+
+
+def normalize_uri(uri: str) -> str:
+    """ Spellings of a URI that fetch the same resource normalize to the same string. """
+    parts = urlsplit(uri.strip())
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or '').lower()
+    try:
+        port = parts.port
+    except ValueError:  # Malformed port, leave it to the request to fail
+        port = None
+    if port is not None and port != default_ports.get(scheme):
+        netloc += ':' + str(port)
+    if parts.username:
+        netloc = parts.username + (':' + parts.password if parts.password else '') + '@' + netloc
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))  # Fragments never reach the server
+
+
+class RequestCoalescer:
+    """
+    Concurrent requests for the same URI share a single in-flight request and its result.
+    The shared request is only cancelled once every request waiting on it has been cancelled.
+    """
+
+    def __init__(self):
+        self.in_flight = dict()  # Normalized URI -> asyncio.Future
+        self.waiters = Counter()  # Normalized URI -> requests waiting on its future
+
+    async def run(self, uri: str, request: Callable[[], Awaitable[Any]]) -> Any:
+        """ Runs request() unless one for the same URI is already running, then waits for that one instead. """
+        key = normalize_uri(uri)
+        future = self.in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(request())
+            self.in_flight[key] = future
+            future.add_done_callback(lambda done: self.finish(key, done))
+
+        self.waiters[key] += 1
+        try:
+            return await asyncio.shield(future)  # One waiter giving up doesn't cancel it for the others
+        except asyncio.CancelledError:
+            if self.in_flight.get(key) is future and self.waiters[key] == 1:
+                # Nobody else wants it. It only finishes cancelling later, a request arriving before then starts anew.
+                del self.in_flight[key]
+                future.cancel()
+            raise
+        finally:
+            self.waiters[key] -= 1
+            if self.waiters[key] <= 0:
+                del self.waiters[key]
+
+    def finish(self, key: str, future: asyncio.Future) -> None:
+        if self.in_flight.get(key) is future:
+            del self.in_flight[key]
+
+    def __len__(self) -> int:
+        return len(self.in_flight)
@@ -0,0 +1,108 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+
+import base64
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional
+
+SEEN = 'seen'
+NEW = 'new'
+UPDATED = 'updated'
+
+
+def digest(text: str, size: int) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=size).hexdigest()
+
+
+class SeenSet:
+    """
+    The entries of a feed that were gathered before, compact enough to be persisted with its FeedState.
+    The most recent entries are kept exactly, by a digest of their link and of their version (GUID and date).
+    Older ones move to a Bloom filter. A false positive there only treats a new entry as seen, which still
+    reaches the store, its article is just fetched when it's read instead of right away.
+    """
+    recent_size = 128  # Entries kept exactly, more than most feeds carry at once
+    bloom_bits = 8192
+    bloom_hashes = 4
+    bloom_capacity = 1000  # Entries the Bloom filter holds before it's started over, about 2% false positives
+
+    def __init__(self, recent: Optional[Dict[str, str]] = None, bloom: Optional[str] = None, bloom_count: int = 0):
+        self.recent = OrderedDict(recent or ())  # Link digest -> version digest, oldest first
+        self.bloom = bytearray(base64.b64decode(bloom)) if bloom else bytearray(self.bloom_bits // 8)
+        self.bloom_count = bloom_count
+
+    @classmethod
+    def from_dict(cls, attributes: Dict[str, Any]):
+        """ Deserialization """
+        return cls(**attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ Serialization, the Bloom filter is left out while it's empty. """
+        return {
+            'recent': dict(self.recent),
+            'bloom': base64.b64encode(self.bloom).decode() if self.bloom_count else None,
+            'bloom_count': self.bloom_count,
+        }
+
+    @staticmethod
+    def version_key(version: Optional[str]) -> str:
+        return digest(version, 4) if version else ''
+
+    def check(self, link: str, version: Optional[str] = None) -> str:
+        """ SEEN, UPDATED if seen with another version, or NEW. An entry without a version is never UPDATED. """
+        link_key = digest(link, 8)
+        version_key = self.version_key(version)
+        if link_key in self.recent:
+            return SEEN if not version_key or self.recent[link_key] == version_key else UPDATED
+        if self.in_bloom(link_key + version_key):
+            return SEEN
+        if version_key and self.in_bloom(link_key):
+            return UPDATED
+        return NEW
+
+    def add(self, link: str, version: Optional[str] = None) -> None:
+        """ An entry added again without a version keeps the one it was seen with. """
+        link_key = digest(link, 8)
+        self.recent[link_key] = self.version_key(version) or self.recent.get(link_key, '')
+        self.recent.move_to_end(link_key)
+        while len(self.recent) > self.recent_size:
+            old_link_key, old_version_key = self.recent.popitem(last=False)
+            self.add_to_bloom(old_link_key)
+            if old_version_key:
+                self.add_to_bloom(old_link_key + old_version_key)
+
+    def bit_positions(self, key: str) -> Iterator[int]:
+        hashed = hashlib.blake2b(key.encode(), digest_size=4 * self.bloom_hashes).digest()
+        for i in range(self.bloom_hashes):
+            yield int.from_bytes(hashed[4 * i:4 * i + 4], 'big') % self.bloom_bits
+
+    def add_to_bloom(self, key: str) -> None:
+        if self.bloom_count >= self.bloom_capacity:  # Forgetting the oldest entries beats false positives for all
+            self.bloom = bytearray(self.bloom_bits // 8)
+            self.bloom_count = 0
+        for position in self.bit_positions(key):
+            self.bloom[position // 8] |= 1 << position % 8
+        self.bloom_count += 1
+
+    def in_bloom(self, key: str) -> bool:
+        return self.bloom_count > 0 and all(self.bloom[position // 8] & 1 << position % 8
+                                            for position in self.bit_positions(key))
@@ -0,0 +1,340 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import logging
+import multiprocessing
+import queue
+import time
+import zlib
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from threading import Lock, Thread
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from cache import Cache
+from feed import Feed
+from feedState import FeedState
+from gatherStats import merge_snapshots
+from gatherer import Gatherer
+from hostLimiter import HostLimiter, Priority
+from item import Item
+from sqliteCache import SqliteCache
+
+logger = logging.getLogger(__name__)
+
+stats_interval = 1  # Seconds between the stats each shard reports
+
+
+class ShardStore:
+    """ Takes the NewsStore's place in a shard, sending items to the parent process instead. """
+
+    def __init__(self, results: multiprocessing.Queue):
+        self.results = results
+
+    def append(self, item: Item) -> None:
+        self.extend([item])
+
+    def extend(self, items: Iterable[Item]) -> None:
+        self.results.put(('items', list(items)))
+
+    def update_article(self, item: Item) -> None:
+        self.results.put(('article', item))
+
+    def clear(self) -> None:
+        pass
+
+
+class ShardCache(Cache):
+    """
+    A shard's copy of the cache, whose new entries are also sent to the parent process's Cache.
+    When the parent's cache is an SQLite database, what isn't in the copy is read from the database.
+    """
+
+    def __init__(self, results: multiprocessing.Queue, entries: Dict[str, Any], database: Optional[str] = None):
+        super().__init__()
+        self.results = results
+        for identifier, value in entries.items():
+            super().put(identifier, value, False)
+        self.database = None
+        if database is not None:
+            self.database = SqliteCache()
+            self.database.cache_directory = database
+
+    def put(self, identifier, value, fresh: bool = True, feed: Optional[str] = None):
+        super().put(identifier, value, fresh, feed)
+        self.results.put(('cache', identifier, value, fresh, feed))
+
+    def query(self, identifier):
+        with self.lock:
+            if identifier in self.cache or self.database is None:
+                return super().query(identifier)
+        return self.database.query(identifier)  # From an earlier session, or put by another shard
+
+
+class ShardWorkerGatherer(Gatherer):
+    """ The Gatherer running in a shard process, which is one of several already. """
+
+    @staticmethod
+    def create_extractor(network_preferences: Dict[str, int]) -> Executor:
+        return ThreadPoolExecutor(max_workers=1)  # One core per shard, without a process pool per shard
+
+    def collapse_duplicate(self, item: Item) -> bool:
+        """ Syndicated copies are mostly on other hosts, so other shards, so the parent collapses them. """
+        return False
+
+
+def shard_worker(
+        index: int,
+        network_preferences: Dict[str, int],
+        fetch_articles: bool,
+        cache_entries: Dict[str, Any],
+        database: Optional[str],
+        commands: multiprocessing.Queue,
+        results: multiprocessing.Queue) -> None:
+    """ Runs in a shard process: a headless Gatherer for the feeds the parent hands it. """
+    gatherer = ShardWorkerGatherer(
+        ShardStore(results),
+        ShardCache(results, cache_entries, database),
+        network_preferences,
+        fetch_articles,
+        headless=True)
+    parent = multiprocessing.parent_process()
+    while parent is None or parent.is_alive():
+        try:
+            command, *arguments = commands.get(timeout=stats_interval)
+        except queue.Empty:
+            results.put(('stats', index, gatherer.gather_stats.snapshot()))
+            continue
+
+        if command == 'refresh':
+            token, feeds = arguments
+            gatherer.refresh(feeds).add_done_callback(
+                lambda done, token=token: refreshed(index, gatherer, results, token))
+        elif command == 'schedule':
+            gatherer.schedule(*arguments)
+        elif command == 'request':
+            gatherer.request(*arguments)
+        elif command == 'probe':
+            gatherer.loop.call_soon_threadsafe(gatherer.keep_probe, *arguments)
+        elif command == 'stop':
+            break
+    gatherer.stop()
+    results.put(('stats', index, gatherer.gather_stats.snapshot()))
+
+
+def refreshed(index: int, gatherer: Gatherer, results: multiprocessing.Queue, token: int) -> None:
+    results.put(('stats', index, gatherer.gather_stats.snapshot()))
+    results.put(('refreshed', index, token))
+
+
+class ShardedGatherer(Gatherer):
+    """
+    Spreads feeds over several processes, each with its own event loop and connection pool and extracting
+    articles itself, so parsing and extraction use as many cores as there are processes. Feeds are assigned by host, which keeps
+    every request to a host in one process, within its per-host limit and on its pooled connections.
+    Items and cache entries from the shards are merged into this process's store and Cache.
+    Articles the reader asks for are still fetched by this process, see read().
+    """
+
+    def __init__(
+            self,
+            store: Any,
+            cache: Cache,
+            network_preferences: Dict[str, int],
+            fetch_articles: bool = True,
+            headless: bool = False,
+            main_context: bool = False):
+        self.shard_count = max(1, network_preferences['Gathering Processes'])
+        super().__init__(store, cache, network_preferences, fetch_articles, headless, main_context)
+
+        context = multiprocessing.get_context('spawn')  # Forking a process that runs GTK is unsafe
+        self.results = context.Queue()
+        self.commands = [context.Queue() for _ in range(self.shard_count)]
+        self.shard_stats = [None] * self.shard_count  # Latest GatherStats snapshot of each shard
+        self.refreshes = dict()  # Token -> (future, indices of the shards yet to finish)
+        self.dead_shards = set()  # Indices of shards that exited without being stopped
+        self.stopping = False
+        self.next_token = 0
+        self.refresh_lock = Lock()  # Refreshes start on the caller's thread and finish on the loop's
+        self.database = cache.cache_directory if isinstance(cache, SqliteCache) else None  # Readable by the shards
+        self.shards = [
+            context.Process(
+                target=shard_worker,
+                args=(
+                    index,
+                    self.shard_preferences(),
+                    fetch_articles,
+                    self.shard_cache_entries(index),
+                    self.database,
+                    commands,
+                    self.results))
+            for index, commands in enumerate(self.commands)]
+        for shard in self.shards:
+            shard.start()
+        self.merger = Thread(target=self.merge_results, daemon=True)
+        self.merger.start()
+
+    def shard_preferences(self) -> Dict[str, int]:
+        """ The connection limit is shared between the shards. """
+        preferences = dict(self.network_preferences)
+        preferences['Connection Limit'] = max(1, preferences['Connection Limit'] // self.shard_count)
+        return preferences
+
+    def shard_cache_entries(self, index: int) -> Dict[str, Any]:
+        """
+        Feed states stay with their shard. Articles go to every shard when it extracts them itself,
+        unless the shards can read them from the SQLite database as they need them.
+        """
+        prefix = FeedState.cache_key('')
+        entries = dict()
+        for identifier, value in self.cache.items('' if self.fetch_articles and self.database is None else prefix):
+            if identifier.startswith(prefix):
+                if self.shard_of(identifier[len(prefix):]) == index:
+                    entries[identifier] = value
+            else:
+                entries[identifier] = value
+        return entries
+
+    def shard_of(self, uri: str) -> int:
+        """ Stable across processes and runs, unlike hash(). """
+        return zlib.crc32(HostLimiter.host_of(uri).encode()) % self.shard_count
+
+    def partition(self, feeds: Iterable[Feed]) -> List[List[Feed]]:
+        shards = [[] for _ in range(self.shard_count)]
+        for feed in feeds:
+            shards[self.shard_of(feed.uri)].append(feed)
+        return shards
+
+    def create_web_sub(self, network_preferences: Dict[str, int]) -> None:
+        """ Hubs are found by whoever parses the feed, here the headless shards, so feeds are only polled. """
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update(merge_snapshots([stats] + [s for s in self.shard_stats if s is not None]))
+        stats['gathering processes'] = sum(shard.is_alive() for shard in self.shards)
+        return stats
+
+    def stop(self) -> None:
+        self.stopping = True  # Shards exiting from here on were asked to
+        for commands in self.commands:
+            commands.put(('stop',))
+        deadline = time.time() + self.shutdown_timeout
+        for shard in self.shards:
+            shard.join(max(0.0, deadline - time.time()))
+            if shard.is_alive():
+                shard.terminate()
+        super().stop()
+
+    def request(self, request: Union[Feed, Item], priority: Priority = Priority.FOREGROUND) -> None:
+        if isinstance(request, Feed):
+            self.forward_probes(self.commands[self.shard_of(request.uri)], [request])
+            self.commands[self.shard_of(request.uri)].put(('request', request, priority))
+        else:
+            super().request(request, priority)
+
+    def refresh(self, feeds: Iterable[Feed]) -> Future:
+        done = Future()
+        with self.refresh_lock:
+            token = self.next_token
+            self.next_token += 1
+            self.refreshes[token] = (done, set(range(self.shard_count)) - self.dead_shards)
+            if not self.refreshes[token][1]:
+                del self.refreshes[token]
+                done.set_exception(RuntimeError('Every gathering process has exited.'))
+                return done
+        for commands, shard_feeds in zip(self.commands, self.partition(feeds)):
+            self.forward_probes(commands, shard_feeds)
+            commands.put(('refresh', token, shard_feeds))
+        return done
+
+    def forward_probes(self, commands: multiprocessing.Queue, feeds: List[Feed]) -> None:
+        """ Feeds are validated by this process but requested by the shards, which get what validate() downloaded. """
+        for feed in feeds:
+            probe = self.take_probe(feed.uri)
+            if probe is not None:
+                commands.put(('probe', feed.uri, probe))
+
+    def schedule(self, feeds: Iterable[Feed]) -> None:
+        for commands, shard_feeds in zip(self.commands, self.partition(feeds)):
+            commands.put(('schedule', shard_feeds))
+
+    def merge_results(self) -> None:
+        """
+        Runs on its own thread, handing what the shards send over to this Gatherer's loop.
+        It also watches the shards, as one that crashes or is killed never reports its refreshes finished.
+        """
+        while not self.stopping:
+            try:
+                message = self.results.get(timeout=stats_interval)
+            except queue.Empty:
+                message = None
+            if message is not None:
+                self.loop.call_soon_threadsafe(self.merge_result, message)
+            for index, shard in enumerate(self.shards):
+                if index not in self.dead_shards and shard.exitcode is not None and not self.stopping:
+                    self.dead_shards.add(index)
+                    self.loop.call_soon_threadsafe(self.shard_died, index, shard.exitcode)
+
+    def shard_died(self, index: int, exitcode: int) -> None:
+        """ Counts as finished for every refresh, its feeds are left ungathered. """
+        logger.error('Gathering process %d exited with code %d, its feeds are not gathered', index, exitcode)
+        for token in list(self.refreshes):
+            self.finish_refresh(index, token)
+
+    def merge_result(self, message: Tuple) -> None:
+        kind, *arguments = message
+        if kind == 'items':
+            for item in arguments[0]:
+                if item.article is None:  # Possibly cached by an earlier session or by the reader
+                    item.article = self.cache.query(item.uri)
+                if not self.collapse_duplicate(item):
+                    self.add_to_store(item)
+        elif kind == 'article':
+            self.update_in_store(arguments[0])
+        elif kind == 'cache':
+            self.cache.put(*arguments)
+        elif kind == 'stats':
+            index, snapshot = arguments
+            self.shard_stats[index] = snapshot
+        elif kind == 'refreshed':
+            self.finish_refresh(*arguments)
+
+    def finish_refresh(self, index: int, token: int) -> None:
+        with self.refresh_lock:
+            if token not in self.refreshes:
+                return
+            done, remaining = self.refreshes[token]
+            remaining.discard(index)
+            if remaining:
+                return
+            del self.refreshes[token]
+        self.loop.call_soon(done.set_result, None)  # After the items merged before it reach the store
+
+
+def create_gatherer(
+        store: Any,
+        cache: Cache,
+        network_preferences: Dict[str, int],
+        fetch_articles: bool = True,
+        headless: bool = False,
+        main_context: bool = False) -> Gatherer:
+    """ A ShardedGatherer when more than one gathering process is configured, a Gatherer otherwise. """
+    gatherer_class = ShardedGatherer if network_preferences['Gathering Processes'] > 1 else Gatherer
+    return gatherer_class(store, cache, network_preferences, fetch_articles, headless, main_context)
@@ -0,0 +1,101 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+
+import hashlib
+import re
+from collections import deque
+from typing import Any, List, Optional, Tuple
+
+bits = 64
+word = re.compile(r'\w+')
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """
+    A 64 bit fingerprint of the text, where texts that differ in a few words differ in a few bits.
+    Each bit is the majority vote of that bit over the hashes of every run of shingle_size words.
+    """
+    words = word.findall(text.lower())
+    shingles = {' '.join(words[i:i + shingle_size]) for i in range(max(1, len(words) - shingle_size + 1))}
+    hashes = [format(int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big'), '064b')
+              for shingle in shingles]
+    threshold = len(hashes) / 2
+    fingerprint = 0
+    for column in zip(*hashes):  # Most significant bit first
+        fingerprint = fingerprint << 1 | (column.count('1') > threshold)
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class SimHashIndex:
+    """
+    Finds a fingerprint within max_distance bits of a given one without comparing against all of them.
+    Fingerprints are split into max_distance + 1 bands: two within max_distance bits of each other
+    are identical in at least one band, so only fingerprints sharing a band with the one looked up are compared.
+    With a capacity, the oldest fingerprints are dropped once there are more.
+    """
+
+    def __init__(self, max_distance: int = 3, capacity: Optional[int] = None):
+        self.max_distance = max_distance
+        self.capacity = capacity
+        self.band_bits = bits // (max_distance + 1)
+        self.bands = [dict() for _ in range(max_distance + 1)]  # Band value -> [(fingerprint, value)]
+        self.order = deque()  # (fingerprint, value), oldest first
+
+    def band_keys(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_bits) - 1
+        return [fingerprint >> (band * self.band_bits) & mask for band in range(len(self.bands))]
+
+    def add(self, fingerprint: int, value: Any) -> None:
+        entry = (fingerprint, value)
+        for band, key in zip(self.bands, self.band_keys(fingerprint)):
+            band.setdefault(key, []).append(entry)
+        self.order.append(entry)
+        if self.capacity is not None and len(self.order) > self.capacity:
+            self.remove(self.order.popleft())
+
+    def remove(self, entry: Tuple[int, Any]) -> None:
+        for band, key in zip(self.bands, self.band_keys(entry[0])):
+            entries = band[key]
+            entries[:] = [e for e in entries if e is not entry]
+            if not entries:
+                del band[key]
+
+    def find(self, fingerprint: int) -> Optional[Any]:
+        """ The value of the nearest fingerprint within max_distance bits, None if there is none. """
+        nearest = None  # type: Optional[Tuple[int, Any]]
+        for band, key in zip(self.bands, self.band_keys(fingerprint)):
+            for candidate, value in band.get(key, []):
+                distance = hamming_distance(fingerprint, candidate)
+                if distance <= self.max_distance and (nearest is None or distance < nearest[0]):
+                    nearest = (distance, value)
+        return nearest[1] if nearest is not None else None
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def clear(self) -> None:
+        for band in self.bands:
+            band.clear()
+        self.order.clear()
@@ -0,0 +1,111 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2016 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+
+import json
+import os
+import sqlite3
+from typing import Any, Hashable, List, Optional, Tuple
+
+from cache import Cache, synchronize_cache
+from fileOperations import ensure_directory_exists, ensured_read_json_file
+
+
+class SqliteCache(Cache):
+    """
+    Keeps the cache in an SQLite database instead of a JSON file. Every put is written as it happens and a query
+    reads a single row, so nothing is loaded at startup or dumped on exit however large the cache grows, and a crash
+    loses nothing. Rows are indexed by identifier and by the feed they came from.
+    The database is opened on first use, so the cache directory can still be changed after construction.
+    """
+
+    def __init__(self, load_from_file: bool = False):
+        super().__init__()
+        self.json_file = self.cache_file  # Imported once when the database is created
+        self.cache_file = 'cache.sqlite3'
+        self.connection = None
+        if load_from_file:
+            self.load_cache()
+
+    def path(self) -> str:
+        return os.path.join(self.cache_directory, self.cache_file)
+
+    def connect(self) -> sqlite3.Connection:
+        if self.connection is None:
+            ensure_directory_exists(self.cache_directory)
+            # Autocommit, each put is its own transaction. Writes come from the Gatherer's loop, reads from GTK too.
+            self.connection = sqlite3.connect(self.path(), isolation_level=None, check_same_thread=False)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')  # Safe in WAL mode, only a power cut can lose a put
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache (identifier TEXT PRIMARY KEY, feed TEXT, value TEXT)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS cache_feed ON cache (feed)')
+        return self.connection
+
+    @synchronize_cache
+    def clear(self) -> None:
+        self.connect().execute('DELETE FROM cache')
+        self.connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    @synchronize_cache
+    def put(self, identifier: Hashable, value: Any, fresh: bool = True, feed: Optional[str] = None):
+        """ Everything put is kept, as the JSON cache does. Replacing a value without a feed keeps the old feed. """
+        if identifier:
+            self.connect().execute(
+                'INSERT INTO cache VALUES (?, ?, ?) ON CONFLICT (identifier) '
+                'DO UPDATE SET value = excluded.value, feed = coalesce(excluded.feed, feed)',
+                (identifier, feed, json.dumps(value)))
+
+    @synchronize_cache
+    def query(self, identifier: Hashable) -> Optional[Any]:
+        row = self.connect().execute('SELECT value FROM cache WHERE identifier = ?', (identifier,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @synchronize_cache
+    def contains(self, identifier: Hashable) -> bool:
+        row = self.connect().execute('SELECT 1 FROM cache WHERE identifier = ?', (identifier,)).fetchone()
+        return row is not None
+
+    @synchronize_cache
+    def items(self, prefix: str = '') -> List[Tuple[Hashable, Any]]:
+        """ A range of the identifier index rather than a scan of the table. """
+        rows = self.connect().execute(
+            'SELECT identifier, value FROM cache WHERE identifier >= ? AND identifier < ?',
+            (prefix, prefix + chr(0x10ffff)))
+        return [(identifier, json.loads(value)) for identifier, value in rows]
+
+    @synchronize_cache
+    def load_cache(self):
+        """ Nothing is loaded, rows are read when queried. A new database starts with the JSON cache's entries. """
+        created = not os.path.isfile(self.path())
+        connection = self.connect()
+        if created:
+            previous = ensured_read_json_file(self.cache_directory, self.json_file, dict())
+            with connection:  # One transaction
+                connection.execute('BEGIN')
+                connection.executemany(
+                    'INSERT OR REPLACE INTO cache (identifier, value) VALUES (?, ?)',
+                    ((k, json.dumps(v)) for k, v in previous.items() if k))
+
+    @synchronize_cache
+    def write_cache(self):
+        """ Everything is already written, this only moves the session's writes from the log into the database. """
+        if self.connection is not None:
+            self.connection.execute('PRAGMA wal_checkpoint(PASSIVE)')
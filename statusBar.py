@@ -0,0 +1,81 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+from typing import Any, Callable, Dict
+
+from gi import require_version
+
+require_version('Gtk', '3.0')
+from gi.repository import GLib, Gtk
+
+from gatherStats import stages
+
+
+class StatusBar(Gtk.Box):
+    """ Bottom bar showing the progress of network requests, polled from the Gatherer's stats(). """
+    update_interval = 500  # Milliseconds between updates
+
+    def __init__(self, stats: Callable[[], Dict[str, Any]]):
+        Gtk.Box.__init__(self, orientation=Gtk.Orientation.HORIZONTAL, spacing=6, margin=3)
+        self.stats = stats
+        self.spinner = Gtk.Spinner()
+        self.label = Gtk.Label('', xalign=0)
+        self.pack_start(self.spinner, False, False, 0)
+        self.pack_start(self.label, True, True, 0)
+        self.timeout_id = GLib.timeout_add(self.update_interval, self.update)
+        self.connect('destroy', self.on_destroy)
+
+    def update(self) -> bool:
+        stats = self.stats()
+        if stats.get('started', 0) > stats.get('finished', 0):
+            self.spinner.start()
+        else:
+            self.spinner.stop()
+        self.label.set_text(self.describe(stats))
+        self.set_tooltip_text(self.describe_timings(stats))
+        return True  # Keep updating
+
+    def on_destroy(self, widget: Gtk.Widget) -> None:
+        GLib.source_remove(self.timeout_id)
+
+    @staticmethod
+    def describe(stats: Dict[str, Any]) -> str:
+        started = stats.get('started', 0)
+        finished = stats.get('finished', 0)
+        parts = ['{} of {} requests done'.format(finished, started) if started > finished else 'Up to date']
+        parts.append('{:.1f} MB'.format(stats.get('bytes', 0) / 1e6))
+        failed = sum(outcomes.get('failed', 0) for outcomes in stats.get('hosts', dict()).values())
+        if failed:
+            parts.append('{} failed'.format(failed))
+        open_circuits = stats.get('open circuits', [])
+        if open_circuits:
+            parts.append('{} hosts paused'.format(len(open_circuits)))
+        return ', '.join(parts)
+
+    @staticmethod
+    def describe_timings(stats: Dict[str, Any]) -> str:
+        timings = stats.get('timings', dict())
+        lines = []
+        for stage in stages:
+            timing = timings.get(stage)
+            if timing and timing['count']:
+                lines.append('{}: {:.2f}s total, {:.0f}ms mean, {:.0f}ms longest'.format(
+                    stage, timing['total'], timing['mean'] * 1000, timing['longest'] * 1000))
+        return '\n'.join(lines) or 'Nothing gathered yet'
@@ -18,11 +18,15 @@
     Trough homepage: https://github.com/glu10/trough
 """
 
-from typing import Optional, Union
+from concurrent.futures import Future
+from typing import Any, Dict, Iterable, List, Optional, Union
 
 from aiohttp import ClientSession
 
+from cache import Cache
 from feed import Feed
+from gatherStats import GatherStats
+from hostLimiter import Priority
 from item import Item
 from newsStore import NewsStore
 
@@ -32,8 +36,10 @@ class StubGatherer:
     Avoids network requests during development.
     """
 
-    def __init__(self, store: NewsStore):
+    def __init__(self, store: NewsStore, cache: Cache, network_preferences: Dict[str, int]):
         self.store = store
+        self.cache = cache
+        self.network_preferences = network_preferences
         lorem = self.__lorem()
 
         description = lorem.split('\n\n', maxsplit=1)[0]
@@ -51,26 +57,53 @@ class StubGatherer:
         with open('tests/resources/lorem', 'r') as f:
             return f.read()
 
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self.network_preferences)
+        stats.update(GatherStats().snapshot())
+        return stats
+
     def work_loop(self) -> None:
         pass
 
     def stop(self) -> None:
         pass
 
-    def request(self, request: Union[Feed, Item]) -> None:
+    def refresh(self, feeds: Iterable[Feed]) -> Future:
+        self.service_item(None, None)
+        done = Future()
+        done.set_result(None)
+        return done
+
+    def schedule(self, feeds: Iterable[Feed]) -> None:
+        pass
+
+    def read(self, current: Item, upcoming: List[Item]) -> None:
+        pass
+
+    def request(self, request: Union[Feed, Item], priority: Priority = Priority.FOREGROUND) -> None:
         self.service_item(None, None)
 
-    def batch_requests(self, requests, session):
+    def batch_requests(self, requests, session: ClientSession, priority: Priority):
         pass
 
-    async def serve_request(self, request: Union[Feed, Item], session: ClientSession) -> None:
+    async def serve_request(
+            self,
+            request: Union[Feed, Item],
+            session: ClientSession,
+            priority: Priority = Priority.FOREGROUND) -> None:
         self.service_item(None, None)
 
-    async def service(self, request: Union[Feed, Item], session: ClientSession, response_text: str) -> None:
+    async def service(
+            self,
+            request: Union[Feed, Item],
+            session: ClientSession,
+            priority: Priority,
+            body: bytes,
+            encoding: Optional[str]) -> None:
         pass
 
-    def service_item(self, item: Optional[Item], html: Optional[str]) -> None:
+    def service_item(self, item: Optional[Item], html: Optional[bytes], encoding: Optional[str] = None) -> None:
         self.store.append(self.stub_item)
 
-    async def service_feed(self, feed: Feed, session: ClientSession, feed_xml: str) -> None:
+    async def service_feed(self, feed: Feed, session: ClientSession, priority: Priority, feed_xml: bytes) -> None:
         self.service_item(None, None)
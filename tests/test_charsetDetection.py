@@ -0,0 +1,57 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import codecs
+from unittest import TestCase, mock
+
+from charsetDetection import decode, detect_encoding
+
+
+class TestCharsetDetection(TestCase):
+
+    def setUp(self):
+        self.text = 'Grüße aus Köln'
+
+    def test_bom_wins(self):
+        body = codecs.BOM_UTF16_LE + self.text.encode('utf-16-le')
+        self.assertEqual(detect_encoding(body, 'iso-8859-1'), 'utf-16-le')
+        self.assertEqual(decode(codecs.BOM_UTF8 + self.text.encode()), self.text)
+
+    def test_declared_header(self):
+        self.assertEqual(detect_encoding(self.text.encode('iso-8859-1'), 'ISO-8859-1'), 'iso8859-1')
+
+    def test_unknown_declared_header_is_ignored(self):
+        self.assertEqual(detect_encoding(self.text.encode(), 'x-not-a-charset'), 'utf-8')
+
+    def test_xml_declaration(self):
+        body = '<?xml version="1.0" encoding="ISO-8859-1"?><rss>{}</rss>'.format(self.text).encode('iso-8859-1')
+        self.assertEqual(detect_encoding(body), 'iso8859-1')
+
+    def test_meta_charset(self):
+        body = '<html><head><meta charset="windows-1252"></head><body>{}</body></html>'.format(self.text)
+        self.assertEqual(decode(body.encode('windows-1252')), body)
+
+        http_equiv = '<meta http-equiv="Content-Type" content="text/html; charset=iso-8859-1">'
+        self.assertEqual(detect_encoding(http_equiv.encode()), 'iso8859-1')
+
+    def test_undeclared(self):
+        self.assertEqual(detect_encoding(self.text.encode()), 'utf-8')
+        with mock.patch('charsetDetection.from_bytes', None):  # Without the optional detector
+            self.assertEqual(decode(self.text.encode('windows-1252')), self.text)
@@ -0,0 +1,90 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import asyncio
+from unittest import TestCase
+
+import aiohttp
+
+from circuitBreaker import CircuitBreaker, backoff_delay, is_transient, retry_after
+
+
+class TestCircuitBreaker(TestCase):
+
+    def setUp(self):
+        self.host = 'example.com'
+        self.breaker = CircuitBreaker(threshold=2, cooldown=10, max_cooldown=15)
+
+    def test_opens_after_threshold(self):
+        self.breaker.record_failure(self.host, 0)
+        self.assertTrue(self.breaker.allow(self.host, 0))
+        self.breaker.record_failure(self.host, 0)
+        self.assertFalse(self.breaker.allow(self.host, 9))
+        self.assertTrue(self.breaker.allow('other.example.com', 9))
+        self.assertEqual(self.breaker.stats(), {'open circuits': [self.host]})
+
+    def test_single_probe_after_cooldown(self):
+        for _ in range(2):
+            self.breaker.record_failure(self.host, 0)
+        self.assertTrue(self.breaker.allow(self.host, 10))
+        self.assertFalse(self.breaker.allow(self.host, 10))  # Only one probe at a time
+
+        self.breaker.record_failure(self.host, 10)  # Failed probe, cooldown doubles up to the maximum
+        self.assertFalse(self.breaker.allow(self.host, 24))
+        self.assertTrue(self.breaker.allow(self.host, 25))
+
+        self.breaker.record_success(self.host)
+        self.assertTrue(self.breaker.allow(self.host, 25))
+        self.assertEqual(self.breaker.stats(), {'open circuits': []})
+
+    def test_only_the_probe_escalates(self):
+        for _ in range(10):  # Requests in flight when the circuit opened
+            self.breaker.record_failure(self.host, 0)
+        self.assertFalse(self.breaker.allow(self.host, 9))
+        self.assertTrue(self.breaker.allow(self.host, 10))
+        self.assertEqual(self.breaker.cooldowns[self.host], 10)
+
+    def test_abandoned_probe(self):
+        for _ in range(2):
+            self.breaker.record_failure(self.host, 0)
+        self.assertTrue(self.breaker.allow(self.host, 10))
+        self.breaker.abandon(self.host)
+        self.assertTrue(self.breaker.allow(self.host, 10))
+
+    def test_is_transient(self):
+        def response_error(status: int) -> aiohttp.ClientResponseError:
+            return aiohttp.ClientResponseError(None, (), status=status)
+
+        self.assertTrue(is_transient(response_error(503)))
+        self.assertFalse(is_transient(response_error(404)))
+        self.assertTrue(is_transient(asyncio.TimeoutError()))
+        self.assertTrue(is_transient(aiohttp.ServerDisconnectedError()))
+        self.assertFalse(is_transient(ValueError()))
+
+    def test_retry_after(self):
+        error = aiohttp.ClientResponseError(None, (), status=429, headers={'Retry-After': '7'})
+        self.assertEqual(retry_after(error), 7)
+        self.assertEqual(retry_after(ValueError()), None)
+
+    def test_backoff_delay(self):
+        self.assertEqual(backoff_delay(0, rng=lambda: 1), 1)
+        self.assertEqual(backoff_delay(3, rng=lambda: 1), 8)
+        self.assertEqual(backoff_delay(10, rng=lambda: 1), 30)
+        self.assertEqual(backoff_delay(10, rng=lambda: 0), 0)
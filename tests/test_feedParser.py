@@ -0,0 +1,93 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+from unittest import TestCase
+
+from feedParser import StreamingFeedParser, parse_feed
+
+
+class TestFeedParser(TestCase):
+
+    def setUp(self):
+        self.rss = (
+            b'<?xml version="1.0" encoding="utf-8"?>\n'
+            b'<rss version="2.0"><channel><title>Channel</title><link>http://127.0.0.1/</link>'
+            b'<item><title>First</title><link>http://127.0.0.1/1</link></item>'
+            b'<item><title><![CDATA[Second & more]]></title><link> http://127.0.0.1/2 </link></item>'
+            b'<item><title>No link</title></item>'
+            b'</channel></rss>')
+        self.atom = (
+            b'<feed xmlns="http://www.w3.org/2005/Atom"><title>Feed</title>'
+            b'<entry><title>Atom</title>'
+            b'<link rel="self" href="http://127.0.0.1/self"/>'
+            b'<link href="http://127.0.0.1/atom"/></entry>'
+            b'</feed>')
+
+    def test_rss(self):
+        expected = [['http://127.0.0.1/1', 'First'], ['http://127.0.0.1/2', 'Second & more']]
+        self.assertEqual(parse_feed(self.rss).entries, expected)
+
+    def test_atom(self):
+        self.assertEqual(parse_feed(self.atom).entries, [['http://127.0.0.1/atom', 'Atom']])
+
+    def test_entries_arrive_before_the_body_ends(self):
+        parser = StreamingFeedParser()
+        split = self.rss.index(b'<item><title><![CDATA')
+        self.assertEqual(parser.feed(self.rss[:split]), [['http://127.0.0.1/1', 'First']])
+        self.assertEqual(parser.feed(self.rss[split:]), [['http://127.0.0.1/2', 'Second & more']])
+        self.assertEqual(parser.close(self.rss), [])
+
+    def test_malformed_falls_back_without_repeating_entries(self):
+        malformed = self.rss.replace(b'<title>No link</title>', b'<title>Broken & unescaped</title>'
+                                                                  b'<link>http://127.0.0.1/3</link>')
+        parser = StreamingFeedParser()
+        streamed = parser.feed(malformed)
+        remaining = parser.close(malformed)
+        self.assertTrue(parser.failed)
+        links = [link for link, title in streamed + remaining]
+        self.assertEqual(links, ['http://127.0.0.1/1', 'http://127.0.0.1/2', 'http://127.0.0.1/3'])
+
+    def test_unknown_format_falls_back(self):
+        self.assertEqual(parse_feed(b'<html><body>Not a feed</body></html>').entries, [])
+
+    def test_polling_hints_outside_entries(self):
+        rss = self.rss.replace(
+            b'<item>',
+            b'<ttl>60</ttl><sy:updatePeriod xmlns:sy="http://purl.org/rss/1.0/modules/syndication/">'
+            b'daily</sy:updatePeriod><item><ttl>1</ttl>', 1)
+        self.assertEqual(parse_feed(rss).hints, {'ttl': '60', 'updatePeriod': 'daily'})
+
+    def test_websub_discovery_outside_entries(self):
+        rss = self.rss.replace(b'<item>', b'<atom:link xmlns:atom="http://www.w3.org/2005/Atom" rel="hub" '
+                                          b'href="http://127.0.0.1/hub"/><item>', 1)
+        self.assertEqual(parse_feed(rss).discovery, {'hub': 'http://127.0.0.1/hub'})
+        self.assertEqual(parse_feed(self.atom).discovery, dict())  # The self link belongs to the entry
+        atom = self.atom.replace(b'<title>Feed</title>', b'<link rel="self" href="http://127.0.0.1/feed"/>'
+                                                         b'<link rel="hub" href="http://127.0.0.1/hub"/>')
+        self.assertEqual(parse_feed(atom).discovery, {'hub': 'http://127.0.0.1/hub', 'self': 'http://127.0.0.1/feed'})
+
+    def test_entry_versions(self):
+        rss = self.rss.replace(b'<title>First</title>', b'<title>First</title><guid>first</guid>'
+                                                        b'<pubDate>Mon, 03 Jul 2017 00:00:00 GMT</pubDate>')
+        self.assertEqual(parse_feed(rss).versions, {'http://127.0.0.1/1': 'first Mon, 03 Jul 2017 00:00:00 GMT'})
+        atom = self.atom.replace(b'<title>Atom</title>', b'<title>Atom</title><id>urn:atom</id>'
+                                                         b'<published>2017-07-01</published>'
+                                                         b'<updated>2017-07-03</updated>')
+        self.assertEqual(parse_feed(atom).versions, {'http://127.0.0.1/atom': 'urn:atom 2017-07-03'})
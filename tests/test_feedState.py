@@ -0,0 +1,56 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+from unittest import TestCase
+
+from feedState import FeedState
+
+
+class TestFeedState(TestCase):
+
+    def setUp(self):
+        self.body = b'<rss><channel><title>test</title></channel></rss>'
+
+    def test_dict_serialization(self):
+        state = FeedState('"abc"', 'Sat, 01 Jul 2017 00:00:00 GMT', 'digest', [['link', 'title']], 600.0, 3600.0)
+        from_state = FeedState.from_dict(state.to_dict())
+        self.assertEqual(state.to_dict(), from_state.to_dict())
+
+    def test_no_validators_no_headers(self):
+        self.assertEqual(FeedState().request_headers(), {})
+
+    def test_validators_become_headers(self):
+        state = FeedState()
+        state.revalidate({'ETag': '"abc"', 'Last-Modified': 'Sat, 01 Jul 2017 00:00:00 GMT'}, self.body)
+        expected = {'If-None-Match': '"abc"', 'If-Modified-Since': 'Sat, 01 Jul 2017 00:00:00 GMT'}
+        self.assertEqual(state.request_headers(), expected)
+
+    def test_revalidate_by_body_hash(self):
+        state = FeedState()
+        self.assertTrue(state.revalidate({}, self.body))
+        self.assertFalse(state.revalidate({}, self.body))
+        self.assertTrue(state.revalidate({}, self.body + b' '))
+
+    def test_needs_body_comparison(self):
+        state = FeedState()
+        self.assertFalse(state.needs_body_comparison({}))  # Nothing to compare against yet
+        state.revalidate({}, self.body)
+        self.assertTrue(state.needs_body_comparison({}))
+        self.assertFalse(state.needs_body_comparison({'ETag': '"abc"'}))
@@ -0,0 +1,92 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+from threading import Thread
+from unittest import TestCase
+
+from gatherStats import GatherStats, merge_snapshots, stages
+
+
+class TestGatherStats(TestCase):
+
+    def test_stage_timings(self):
+        stats = GatherStats()
+        stats.record('parse', 0.25)
+        stats.record('parse', 0.75)
+        with stats.timed('extract'):
+            pass
+        timings = stats.snapshot()['timings']
+        self.assertEqual(set(timings), set(stages))
+        self.assertEqual(timings['parse'], {'count': 2, 'total': 1.0, 'mean': 0.5, 'longest': 0.75})
+        self.assertEqual(timings['extract']['count'], 1)
+        self.assertEqual(timings['queue']['mean'], 0.0)
+
+    def test_timed_records_failures_too(self):
+        stats = GatherStats()
+        with self.assertRaises(ValueError):
+            with stats.timed('download'):
+                raise ValueError()
+        self.assertEqual(stats.snapshot()['timings']['download']['count'], 1)
+
+    def test_outcomes_per_feed_and_host(self):
+        stats = GatherStats()
+        for _ in range(3):
+            stats.start()
+        stats.finish('Feed A', 'a.example', 'succeeded')
+        stats.finish('Feed A', 'b.example', 'failed')
+        stats.transferred(100)
+        snapshot = stats.snapshot()
+        self.assertEqual((snapshot['started'], snapshot['finished'], snapshot['bytes']), (3, 2, 100))
+        self.assertEqual(snapshot['feeds'], {'Feed A': {'succeeded': 1, 'failed': 1}})
+        self.assertEqual(snapshot['hosts'], {'a.example': {'succeeded': 1}, 'b.example': {'failed': 1}})
+
+    def test_concurrent_recording(self):
+        stats = GatherStats()
+
+        def record():
+            for _ in range(1000):
+                stats.record('insert', 0.001)
+                stats.transferred(1)
+
+        threads = [Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot['timings']['insert']['count'], 4000)
+        self.assertEqual(snapshot['bytes'], 4000)
+
+    def test_merge_snapshots(self):
+        first, second = GatherStats(), GatherStats()
+        first.record('parse', 0.5)
+        second.record('parse', 1.5)
+        first.transferred(10)
+        second.transferred(5)
+        first.start()
+        first.finish('Feed A', 'a.example', 'succeeded')
+        second.start()
+        second.finish('Feed B', 'a.example', 'failed')
+        merged = merge_snapshots([first.snapshot(), second.snapshot()])
+        self.assertEqual(merged['timings']['parse'], {'count': 2, 'total': 2.0, 'mean': 1.0, 'longest': 1.5})
+        self.assertEqual((merged['started'], merged['finished'], merged['bytes']), (2, 2, 15))
+        self.assertEqual(merged['hosts'], {'a.example': {'succeeded': 1, 'failed': 1}})
+        self.assertEqual(set(merged['feeds']), {'Feed A', 'Feed B'})
+        self.assertEqual(merge_snapshots([])['bytes'], 0)
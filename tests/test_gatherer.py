@@ -0,0 +1,251 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+
+import json
+import threading
+from collections import Counter
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from typing import Any, Callable, Dict, Optional, Tuple
+from unittest import TestCase, skipIf
+
+from cache import Cache
+from feed import Feed
+from hostLimiter import Priority
+from item import Item
+from preferences import Preferences
+
+try:
+    from gatherer import Gatherer
+    from headless import JsonLinesStore
+    from shardedGatherer import ShardedGatherer
+except ImportError:  # Article extraction needs newspaper
+    Gatherer = JsonLinesStore = ShardedGatherer = None
+
+paragraph = 'The quick brown fox jumps over the lazy dog while the cat watches from the windowsill. '
+
+
+class StandInSite:
+    """ Serves feeds and articles from loopback on a thread of its own, counting the requests for each path. """
+
+    def __init__(self):
+        self.pages = dict()  # type: Dict[str, Tuple[bytes, Optional[str], float]]  # Path -> body, ETag, delay
+        self.requests = Counter()
+        self.unavailable = dict()  # type: Dict[str, str]  # Path -> Retry-After of the 503 answered instead
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                site.requests[self.path] += 1
+                if self.path in site.unavailable:
+                    self.send_response(503)
+                    self.send_header('Retry-After', site.unavailable[self.path])
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body, etag, delay = site.pages[self.path]
+                if delay:
+                    threading.Event().wait(delay)
+                if etag is not None and self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                if etag is not None:
+                    self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.uri = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def add_feed(self, path: str, items: int, etag: Optional[str] = None, delay: float = 0) -> Feed:
+        """ A feed of items with GUIDs and dates, each article long enough to be told apart from the others. """
+        entries = ''.join(
+            '<item><title>{0}</title><link>{1}/articles/{0}</link><guid>{0}</guid>'
+            '<pubDate>Mon, 03 Jul 2017 00:00:00 GMT</pubDate></item>'.format(i, self.uri) for i in range(items))
+        body = '<rss><channel><title>{}</title>{}</channel></rss>'.format(path, entries)
+        self.pages[path] = (body.encode(), etag, delay)
+        for i in range(items):
+            text = '<p>Article {}. {}</p>'.format(i, paragraph * (5 + i))
+            self.pages['/articles/{}'.format(i)] = ('<html><body>{}</body></html>'.format(text).encode(), None, 0)
+        return Feed(path, self.uri + path)
+
+    def article_requests(self) -> int:
+        return sum(count for path, count in self.requests.items() if path.startswith('/articles/'))
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ItemList(list):
+    """ Takes the NewsStore's place. """
+
+    def update_article(self, item) -> None:
+        pass
+
+
+@skipIf(Gatherer is None, 'newspaper is not installed')
+class TestGatherer(TestCase):
+
+    def setUp(self):
+        self.site = StandInSite()
+        self.cache = Cache()
+
+    def tearDown(self):
+        self.site.stop()
+
+    def start_gatherer(self, store: list, fetch_articles: bool = True):
+        class ThreadedGatherer(Gatherer):
+            @staticmethod
+            def create_extractor(network_preferences: Dict[str, int]) -> Executor:
+                return ThreadPoolExecutor(max_workers=1)
+
+        gatherer = ThreadedGatherer(
+            store, self.cache, Preferences.default_network_preferences(), fetch_articles, headless=True)
+        self.addCleanup(gatherer.stop)
+        return gatherer
+
+    @staticmethod
+    def on_loop(gatherer, function: Callable[..., Any], *arguments: Any) -> Any:
+        """ Calls the function on the Gatherer's thread, like everything it does itself. """
+        done = Future()
+        gatherer.loop.call_soon_threadsafe(lambda: done.set_result(function(*arguments)))
+        return done.result(5)
+
+    def session(self, feed: Feed) -> list:
+        """ One run of Trough: a new Gatherer on the same cache, refreshing the feed once. """
+        store = ItemList()
+        gatherer = self.start_gatherer(store)
+        gatherer.refresh([feed]).result(10)
+        gatherer.stop()
+        return store
+
+    def test_only_new_entries_are_requested_after_an_unchanged_session(self):
+        feed = self.site.add_feed('/feed', 3, etag='"1"')
+        self.assertEqual(len(self.session(feed)), 3)
+        self.assertEqual(self.site.article_requests(), 3)
+
+        self.assertEqual(len(self.session(feed)), 3)  # 304, the remembered entries are replayed
+        self.assertEqual(self.site.article_requests(), 3)
+
+        self.site.add_feed('/feed', 4, etag='"2"')
+        self.assertEqual(len(self.session(feed)), 4)
+        self.assertEqual(self.site.article_requests(), 4)
+
+    def test_long_retry_after_fails_the_request(self):
+        feed = self.site.add_feed('/feed', 1)
+        self.site.unavailable['/feed'] = '86400'
+        store = ItemList()
+        self.start_gatherer(store).refresh([feed]).result(10)
+        self.assertEqual(self.site.requests['/feed'], 1)
+        self.assertEqual(store, [])
+
+    def test_refresh_superseding_a_loading_one_still_gathers(self):
+        feed = self.site.add_feed('/slow', 3, delay=0.5)
+        store = ItemList()
+        gatherer = self.start_gatherer(store)
+        first = gatherer.refresh([feed])
+        threading.Event().wait(0.1)
+        gatherer.refresh([feed]).result(10)
+        first.result(10)
+        self.assertEqual(len(store), 3)
+
+    def test_copies_are_collapsed_across_feeds_only(self):
+        out = StringIO()
+        store = JsonLinesStore(out)
+        gatherer = self.start_gatherer(store)
+        story = 'Article. ' + paragraph * 5
+        original = Item('Wire, Inc.', self.site.uri + '/1', article=story)
+        self.assertFalse(self.on_loop(gatherer, gatherer.collapse_duplicate, original))
+        store.append(original)
+        same_feed = Item('Wire, Inc.', self.site.uri + '/2', article=story + ' Updated.')
+        self.assertFalse(self.on_loop(gatherer, gatherer.collapse_duplicate, same_feed))
+        for name in ('Inc.', 'Paper'):
+            other_feed = Item(name, self.site.uri + '/3', article=story)
+            self.assertTrue(self.on_loop(gatherer, gatherer.collapse_duplicate, other_feed))
+        self.assertEqual(original.feeds, ['Wire, Inc.', 'Inc.', 'Paper'])
+        self.assertEqual(original.feed_name, 'Wire, Inc., Inc., Paper')
+
+        self.on_loop(gatherer, lambda: None)  # The updates are handed off
+        self.assertEqual(store.count, 1)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([record.get('update', False) for record in records], [False, True, True])
+
+    def test_prefetch_the_reader_reaches_becomes_interactive(self):
+        self.site.add_feed('/feed', 2)
+        for path in ('/articles/0', '/articles/1'):
+            body, etag, delay = self.site.pages[path]
+            self.site.pages[path] = (body, etag, 0.3)
+        gatherer = self.start_gatherer(ItemList(), fetch_articles=False)
+        current, upcoming = Item('Feed', self.site.uri + '/articles/0'), Item('Feed', self.site.uri + '/articles/1')
+
+        self.on_loop(gatherer, gatherer.set_reading_position, current, [upcoming])
+        self.assertEqual(self.on_loop(gatherer, lambda: gatherer.prefetches[upcoming.uri][1]), Priority.BACKGROUND)
+        self.on_loop(gatherer, gatherer.set_reading_position, upcoming, [])
+        self.assertEqual(self.on_loop(gatherer, lambda: gatherer.prefetches[upcoming.uri][1]), Priority.INTERACTIVE)
+        self.assertNotIn(current.uri, self.on_loop(gatherer, lambda: dict(gatherer.prefetches)))
+
+        for _ in range(50):
+            if upcoming.article is not None:
+                break
+            threading.Event().wait(0.1)
+        self.assertIsNotNone(upcoming.article)
+
+    def test_validated_feeds_are_kept_only_when_asked(self):
+        feeds = [self.site.add_feed('/feed', 1), self.site.add_feed('/other', 1)]
+        gatherer = self.start_gatherer(ItemList())
+        self.assertEqual(gatherer.validate(feeds).result(10), feeds)
+        self.assertEqual(gatherer.probes, dict())
+        gatherer.validate(feeds[:1], keep_probes=True, priority=Priority.INTERACTIVE).result(10)
+        self.assertIsNotNone(gatherer.take_probe(feeds[0].uri))
+
+
+@skipIf(Gatherer is None, 'newspaper is not installed')
+class TestShardedGatherer(TestCase):
+
+    def setUp(self):
+        self.site = StandInSite()
+
+    def tearDown(self):
+        self.site.stop()
+
+    def test_refresh_finishes_when_a_shard_dies(self):
+        feed = self.site.add_feed('/slow', 1, delay=2)
+        preferences = Preferences.default_network_preferences()
+        preferences['Gathering Processes'] = 2
+        gatherer = ShardedGatherer(ItemList(), Cache(), preferences, headless=True)
+        self.addCleanup(gatherer.stop)
+        gatherer.refresh([]).result(30)  # Every shard is up
+        refreshing = gatherer.refresh([feed])
+        while not self.site.requests['/slow']:
+            threading.Event().wait(0.05)
+        gatherer.shards[gatherer.shard_of(feed.uri)].kill()
+        refreshing.result(10)
+        self.assertEqual(gatherer.dead_shards, {gatherer.shard_of(feed.uri)})
+        gatherer.refresh([feed]).result(10)  # Later refreshes don't wait on it either
@@ -0,0 +1,108 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import asyncio
+from unittest import TestCase
+
+from hostLimiter import HostLimiter, Priority
+
+
+class TestHostLimiter(TestCase):
+
+    def test_host_of(self):
+        self.assertEqual(HostLimiter.host_of('http://example.com:8080/a?b=c'), 'example.com')
+        self.assertEqual(HostLimiter.host_of('not a uri'), '')
+
+    def test_per_host_cap_does_not_block_other_hosts(self):
+        limiter = HostLimiter(per_host=2, limit=100)
+        release = None
+        peak = {'busy.example': 0, 'quiet.example': 0}
+
+        async def fetch(uri: str) -> None:
+            async with limiter.slot(uri):
+                host = limiter.host_of(uri)
+                peak[host] = max(peak[host], limiter.stats()['active'][host])
+                if host == 'busy.example':
+                    await release.wait()
+
+        async def run() -> None:
+            nonlocal release
+            release = asyncio.Event()
+            busy = [asyncio.ensure_future(fetch('http://busy.example/' + str(i))) for i in range(10)]
+            await asyncio.sleep(0)
+            await asyncio.wait_for(fetch('http://quiet.example/'), 1)  # Not stuck behind the busy host
+            self.assertEqual(limiter.stats()['waiting'], {'busy.example': 8})
+            release.set()
+            await asyncio.gather(*busy)
+
+        asyncio.run(run())
+        self.assertEqual(peak, {'busy.example': 2, 'quiet.example': 1})
+        self.assertEqual(limiter.stats(), {'active': {}, 'waiting': {}})
+
+    def test_admission_by_priority(self):
+        limiter = HostLimiter(per_host=10, limit=2)
+        order = []
+
+        async def fetch(uri: str, priority: Priority, hold: asyncio.Event) -> None:
+            async with limiter.slot(uri, priority):
+                order.append((uri, priority))
+                await hold.wait()
+
+        async def run() -> None:
+            hold = asyncio.Event()
+            released = asyncio.Event()
+            released.set()
+            tasks = [asyncio.ensure_future(fetch('http://a.example/' + str(i), Priority.FOREGROUND, hold))
+                     for i in range(2)]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.ensure_future(fetch('http://b.example/', Priority.BACKGROUND, released)))
+            tasks.append(asyncio.ensure_future(fetch('http://c.example/', Priority.INTERACTIVE, released)))
+            await asyncio.sleep(0)
+            hold.set()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        self.assertEqual([priority for uri, priority in order[2:]], [Priority.INTERACTIVE, Priority.BACKGROUND])
+
+    def test_background_leaves_room(self):
+        limiter = HostLimiter(per_host=10, limit=4)
+
+        async def run() -> None:
+            hold = asyncio.Event()
+
+            async def fetch(uri: str, priority: Priority) -> None:
+                async with limiter.slot(uri, priority):
+                    await hold.wait()
+
+            background = [asyncio.ensure_future(fetch('http://a.example/' + str(i), Priority.BACKGROUND))
+                          for i in range(4)]
+            await asyncio.sleep(0)
+            self.assertEqual(limiter.stats(), {'active': {'a.example': 2}, 'waiting': {'a.example': 2}})
+
+            interactive = asyncio.ensure_future(fetch('http://b.example/', Priority.INTERACTIVE))
+            await asyncio.sleep(0)
+            self.assertEqual(limiter.stats()['active'], {'a.example': 2, 'b.example': 1})
+
+            background[-1].cancel()
+            hold.set()
+            await asyncio.gather(interactive, *background[:-1])
+
+        asyncio.run(run())
+        self.assertEqual(limiter.stats(), {'active': {}, 'waiting': {}})
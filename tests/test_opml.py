@@ -0,0 +1,60 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+
+from unittest import TestCase
+
+from feed import Feed
+from opml import read_opml, write_opml
+
+
+class TestOpml(TestCase):
+
+    def setUp(self):
+        self.opml = (
+            b'<?xml version="1.0"?>\n'
+            b'<opml version="1.0"><head><title>Subscriptions</title></head><body>'
+            b'<outline text="News">'
+            b'<outline text="First" title="First Feed" type="rss" xmlUrl="http://127.0.0.1/1"/>'
+            b'<outline text="Second" type="rss" xmlUrl=" http://127.0.0.1/2 "/>'
+            b'</outline>'
+            b'<outline text="First Feed" type="rss" xmlUrl="http://127.0.0.1/3"/>'
+            b'<outline text="Repeated" type="rss" xmlUrl="http://127.0.0.1/1"/>'
+            b'</body></opml>')
+
+    def test_read(self):
+        feeds = read_opml(self.opml)
+        self.assertEqual([feed.uri for feed in feeds],
+                         ['http://127.0.0.1/1', 'http://127.0.0.1/2', 'http://127.0.0.1/3'])
+        self.assertEqual([feed.name for feed in feeds], ['First Feed', 'Second', 'First Feed (2)'])
+
+    def test_read_leaves_out_existing_feeds(self):
+        feeds = read_opml(self.opml, [Feed('Second', 'http://127.0.0.1/other'), Feed('Mine', 'http://127.0.0.1/3')])
+        self.assertEqual([feed.to_value_list() for feed in feeds], [['First Feed', 'http://127.0.0.1/1'],
+                                                                   ['Second (2)', 'http://127.0.0.1/2']])
+
+    def test_round_trip(self):
+        feeds = [Feed('One & Two', 'http://127.0.0.1/1?a=1&b=2'), Feed('Three', 'http://127.0.0.1/3')]
+        self.assertEqual([feed.to_value_list() for feed in read_opml(write_opml(feeds))],
+                         [feed.to_value_list() for feed in feeds])
+
+    def test_not_opml(self):
+        self.assertRaises(ValueError, read_opml, b'<rss><channel/></rss>')
+        self.assertRaises(ValueError, read_opml, b'')
@@ -0,0 +1,72 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+from unittest import TestCase
+
+from feed import Feed
+from pollScheduler import DEFAULT_INTERVAL, MAX_INTERVAL, MIN_INTERVAL, PollScheduler, feed_hint, max_age, \
+    next_interval
+
+
+class TestPollScheduler(TestCase):
+
+    def setUp(self):
+        self.feed = Feed('test name', 'http://127.0.0.1:8080')
+        self.other_feed = Feed('other name', 'http://127.0.0.1:8081')
+
+    def test_feed_hint(self):
+        self.assertEqual(feed_hint({}), None)
+        self.assertEqual(feed_hint({'ttl': '60'}), 3600)
+        self.assertEqual(feed_hint({'updatePeriod': 'daily', 'updateFrequency': '4'}), 6 * 60 * 60)
+        self.assertEqual(feed_hint({'ttl': '60', 'updatePeriod': 'daily'}), 24 * 60 * 60)
+        self.assertEqual(feed_hint({'ttl': 'soon', 'updatePeriod': 'sometimes'}), None)
+
+    def test_max_age(self):
+        self.assertEqual(max_age(None), None)
+        self.assertEqual(max_age('no-cache'), None)
+        self.assertEqual(max_age('public, max-age=600'), 600)
+
+    def test_next_interval_backs_off_and_speeds_up(self):
+        self.assertEqual(next_interval(None, False), 2 * DEFAULT_INTERVAL)
+        self.assertEqual(next_interval(None, True), DEFAULT_INTERVAL / 2)
+        self.assertEqual(next_interval(MIN_INTERVAL, True), MIN_INTERVAL)
+        self.assertEqual(next_interval(MAX_INTERVAL, False), MAX_INTERVAL)
+
+    def test_next_interval_respects_hints(self):
+        self.assertEqual(next_interval(DEFAULT_INTERVAL, True, 3600, None), 3600)
+        self.assertEqual(next_interval(MAX_INTERVAL, False, 2 * MAX_INTERVAL), 2 * MAX_INTERVAL)
+
+    def test_scheduling(self):
+        scheduler = PollScheduler(rng=lambda: 0.5)  # No jitter, first polls halfway through the interval
+        self.assertEqual(scheduler.seconds_until_next(0), None)
+
+        scheduler.set_feeds([(self.feed, 100), (self.other_feed, None)], 0)
+        self.assertEqual(scheduler.seconds_until_next(0), 50)
+        self.assertEqual(scheduler.due_feeds(49), [])
+        self.assertEqual(scheduler.due_feeds(50), [self.feed])
+        self.assertEqual(scheduler.seconds_until_next(50), 100)
+
+        scheduler.reschedule(self.feed.uri, 1000, 60)
+        self.assertEqual(scheduler.due_feeds(DEFAULT_INTERVAL / 2), [self.other_feed])
+
+        scheduler.set_feeds([(self.other_feed, None)], 2000)
+        self.assertEqual(list(scheduler.due), [self.other_feed.uri])
+        scheduler.reschedule(self.feed.uri, 1000, 2000)  # Removed feeds stay removed
+        self.assertEqual(list(scheduler.due), [self.other_feed.uri])
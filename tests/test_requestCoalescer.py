@@ -0,0 +1,120 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+import asyncio
+from unittest import TestCase
+
+from requestCoalescer import RequestCoalescer, normalize_uri
+
+
+class TestRequestCoalescer(TestCase):
+
+    def test_normalize_uri(self):
+        expected = 'http://example.com/a?b=c'
+        self.assertEqual(normalize_uri('HTTP://Example.COM:80/a?b=c#section'), expected)
+        self.assertEqual(normalize_uri(' http://example.com/a?b=c '), expected)
+        self.assertEqual(normalize_uri('http://example.com'), 'http://example.com/')
+        self.assertEqual(normalize_uri('https://example.com:8443/'), 'https://example.com:8443/')
+        self.assertNotEqual(normalize_uri('http://example.com/A'), normalize_uri('http://example.com/a'))
+
+    def test_concurrent_requests_share_one_result(self):
+        coalescer = RequestCoalescer()
+        calls = []
+
+        async def request() -> str:
+            calls.append(None)
+            await asyncio.sleep(0)
+            return 'article'
+
+        async def run() -> list:
+            results = await asyncio.gather(
+                coalescer.run('http://example.com/a', request),
+                coalescer.run('http://EXAMPLE.com/a#comments', request))
+            self.assertEqual(len(coalescer), 0)  # Cleared once finished
+            results.append(await coalescer.run('http://example.com/a', request))
+            return results
+
+        self.assertEqual(asyncio.run(run()), ['article'] * 3)
+        self.assertEqual(len(calls), 2)  # The third request came after the first finished
+
+    def test_failures_are_shared(self):
+        coalescer = RequestCoalescer()
+
+        async def request() -> None:
+            await asyncio.sleep(0)
+            raise ValueError('failed')
+
+        async def run() -> list:
+            return await asyncio.gather(
+                coalescer.run('http://example.com/a', request),
+                coalescer.run('http://example.com/a', request),
+                return_exceptions=True)
+
+        results = asyncio.run(run())
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(len(coalescer), 0)
+
+    def test_cancelled_once_nobody_waits(self):
+        coalescer = RequestCoalescer()
+        started = []
+        cancelled = []
+
+        async def request() -> None:
+            started.append(None)
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(None)
+                raise
+
+        async def run() -> None:
+            first = asyncio.ensure_future(coalescer.run('http://example.com/a', request))
+            second = asyncio.ensure_future(coalescer.run('http://example.com/a', request))
+            await asyncio.sleep(0)
+            first.cancel()
+            await asyncio.sleep(0)
+            self.assertEqual(cancelled, [])  # The second request still wants it
+            second.cancel()
+            await asyncio.gather(first, second, return_exceptions=True)
+            await asyncio.sleep(0)
+
+        asyncio.run(run())
+        self.assertEqual((len(started), len(cancelled)), (1, 1))
+        self.assertEqual(len(coalescer), 0)
+
+    def test_request_after_cancellation_starts_anew(self):
+        coalescer = RequestCoalescer()
+        started = []
+
+        async def request() -> str:
+            started.append(None)
+            await asyncio.sleep(0.01)
+            return 'feed'
+
+        async def run() -> str:
+            stale = asyncio.ensure_future(coalescer.run('http://example.com/a', request))
+            await asyncio.sleep(0)
+            stale.cancel()  # As a refresh superseded by another one does
+            fresh = asyncio.ensure_future(coalescer.run('http://example.com/a', request))
+            await asyncio.gather(stale, return_exceptions=True)
+            return await fresh
+
+        self.assertEqual(asyncio.run(run()), 'feed')
+        self.assertEqual(len(started), 2)
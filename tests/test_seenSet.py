@@ -0,0 +1,63 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+
+from unittest import TestCase
+
+from seenSet import NEW, SEEN, UPDATED, SeenSet
+
+
+class TestSeenSet(TestCase):
+
+    def test_new_seen_and_updated(self):
+        seen = SeenSet()
+        self.assertEqual(seen.check('http://127.0.0.1/1', 'guid-1 Mon, 03 Jul 2017'), NEW)
+        seen.add('http://127.0.0.1/1', 'guid-1 Mon, 03 Jul 2017')
+        self.assertEqual(seen.check('http://127.0.0.1/1', 'guid-1 Mon, 03 Jul 2017'), SEEN)
+        self.assertEqual(seen.check('http://127.0.0.1/1', 'guid-1 Tue, 04 Jul 2017'), UPDATED)
+        self.assertEqual(seen.check('http://127.0.0.1/1'), SEEN)  # Without a version it can't have changed
+        self.assertEqual(seen.check('http://127.0.0.1/2'), NEW)
+
+    def test_older_entries_move_to_the_bloom_filter(self):
+        seen = SeenSet()
+        links = ['http://127.0.0.1/{}'.format(i) for i in range(SeenSet.recent_size + 10)]
+        for link in links:
+            seen.add(link, link + ' v1')
+        self.assertEqual(len(seen.recent), SeenSet.recent_size)
+        self.assertEqual(seen.check(links[0], links[0] + ' v1'), SEEN)
+        self.assertEqual(seen.check(links[0], links[0] + ' v2'), UPDATED)
+        self.assertEqual(seen.check(links[0]), SEEN)
+        new = [seen.check('http://127.0.0.1/new/{}'.format(i)) for i in range(200)]
+        self.assertLess(new.count(SEEN), 10)  # False positives are rare
+
+    def test_dict_serialization(self):
+        seen = SeenSet()
+        for i in range(SeenSet.recent_size + 1):
+            seen.add('http://127.0.0.1/{}'.format(i), str(i))
+        restored = SeenSet.from_dict(seen.to_dict())
+        self.assertEqual(restored.to_dict(), seen.to_dict())
+        self.assertEqual(restored.check('http://127.0.0.1/0', '0'), SEEN)
+        self.assertIsNone(SeenSet().to_dict()['bloom'])  # An empty filter isn't persisted
+
+    def test_adding_without_a_version_keeps_the_version(self):
+        seen = SeenSet()
+        seen.add('http://127.0.0.1/1', 'guid-1 Mon, 03 Jul 2017')
+        seen.add('http://127.0.0.1/1')
+        self.assertEqual(seen.check('http://127.0.0.1/1', 'guid-1 Mon, 03 Jul 2017'), SEEN)
@@ -0,0 +1,71 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+
+import random
+from unittest import TestCase
+
+from simHash import SimHashIndex, hamming_distance, simhash
+
+
+class TestSimHash(TestCase):
+
+    def setUp(self):
+        words = ['markets', 'rallied', 'after', 'the', 'central', 'bank', 'said', 'rates', 'would', 'hold', 'steady',
+                 'analysts', 'expect', 'growth', 'to', 'slow', 'next', 'year', 'as', 'exports', 'weaken']
+        rng = random.Random(42)
+        self.story = ' '.join(rng.choice(words) for _ in range(600))
+        self.other_story = ' '.join(rng.choice(words) for _ in range(600))
+
+    def test_similar_texts_have_close_fingerprints(self):
+        edited = self.story.replace('markets', 'Markets', 1) + ' Reporting by a wire service.'
+        self.assertEqual(simhash(self.story), simhash(self.story.upper()))
+        self.assertLessEqual(hamming_distance(simhash(self.story), simhash(edited)), 3)
+        self.assertGreater(hamming_distance(simhash(self.story), simhash(self.other_story)), 3)
+
+    def test_index_finds_the_nearest_fingerprint(self):
+        index = SimHashIndex(max_distance=3)
+        index.add(0b1111, 'four ones')
+        index.add(0b0011, 'two ones')
+        self.assertEqual(index.find(0), 'two ones')
+        self.assertEqual(index.find(0b1110), 'four ones')
+        self.assertEqual(index.find(0b1111 << 60), None)
+        self.assertEqual(len(index), 2)
+
+    def test_index_catches_every_band(self):
+        index = SimHashIndex(max_distance=3)
+        fingerprint = random.Random(1).getrandbits(64)
+        index.add(fingerprint, 'story')
+        for flipped in ([0, 16, 32], [15, 31, 47], [48, 49, 63]):  # Three bits differing in three bands
+            near = fingerprint
+            for bit in flipped:
+                near ^= 1 << bit
+            self.assertEqual(index.find(near), 'story')
+        index.clear()
+        self.assertIsNone(index.find(fingerprint))
+
+    def test_index_capacity_drops_the_oldest(self):
+        index = SimHashIndex(max_distance=3, capacity=2)
+        index.add(0, 'first')
+        index.add(0b1111 << 16, 'second')
+        index.add(0b1111 << 32, 'third')
+        self.assertEqual(len(index), 2)
+        self.assertIsNone(index.find(0))
+        self.assertEqual(index.find(0b1111 << 32), 'third')
@@ -0,0 +1,79 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2016 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+
+import tempfile
+from unittest import TestCase
+
+from fileOperations import write_json_file
+from sqliteCache import SqliteCache
+
+
+class TestSqliteCache(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = self.open_cache()
+
+    def tearDown(self):
+        self.cache.connection.close()
+        self.directory.cleanup()
+
+    def open_cache(self) -> SqliteCache:
+        cache = SqliteCache()
+        cache.cache_directory = self.directory.name
+        cache.load_cache()
+        return cache
+
+    def test_put_and_query(self):
+        self.cache.put('http://127.0.0.1/1', 'Article', feed='Feed')
+        self.cache.put('feed:http://127.0.0.1/feed', {'etag': '"abc"', 'entries': [['link', 'title']]})
+        self.assertEqual(self.cache.query('http://127.0.0.1/1'), 'Article')
+        self.assertEqual(self.cache.query('feed:http://127.0.0.1/feed')['entries'], [['link', 'title']])
+        self.assertIsNone(self.cache.query('http://127.0.0.1/2'))
+        self.cache.put('http://127.0.0.1/1', None)  # An article that has to be fetched again
+        self.assertIsNone(self.cache.query('http://127.0.0.1/1'))
+        self.assertTrue(self.cache.contains('http://127.0.0.1/1'))
+
+    def test_puts_are_written_immediately(self):
+        self.cache.put('http://127.0.0.1/1', 'Article')
+        other = self.open_cache()  # Without write_cache(), as after a crash
+        self.assertEqual(other.query('http://127.0.0.1/1'), 'Article')
+        other.connection.close()
+
+    def test_items_by_prefix(self):
+        for identifier in ('feed:http://a/', 'feed:http://b/', 'http://a/1'):
+            self.cache.put(identifier, identifier)
+        self.assertEqual(sorted(k for k, _ in self.cache.items('feed:')), ['feed:http://a/', 'feed:http://b/'])
+        self.assertEqual(len(self.cache.items()), 3)
+        self.cache.clear()
+        self.assertEqual(self.cache.items(), [])
+
+    def test_json_cache_imported_once(self):
+        self.cache.connection.close()
+        self.directory.cleanup()
+        self.directory = tempfile.TemporaryDirectory()
+        write_json_file(self.directory.name, 'cache.json', {'http://127.0.0.1/1': 'Article'})
+        self.cache = self.open_cache()
+        self.assertEqual(self.cache.query('http://127.0.0.1/1'), 'Article')
+        self.cache.put('http://127.0.0.1/1', 'Updated')
+        self.cache.connection.close()
+        self.cache = self.open_cache()
+        self.assertEqual(self.cache.query('http://127.0.0.1/1'), 'Updated')
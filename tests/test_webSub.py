@@ -0,0 +1,169 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+
+import asyncio
+import hashlib
+import hmac
+import secrets
+import socket
+import time
+from unittest import TestCase
+
+from aiohttp import ClientSession, web
+
+from feed import Feed
+from feedState import FeedState
+from webSub import WebSubServer, signature_matches
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class StandInHub:
+    """ Verifies subscriptions and pushes content to them like a real hub would, on loopback. """
+
+    def __init__(self, session: ClientSession):
+        self.session = session
+        self.subscriptions = dict()  # Topic -> (callback, secret)
+        self.verified = asyncio.Event()
+        self.runner = None
+        self.uri = None
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post('/', self.on_request)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        port = free_port()
+        await web.TCPSite(self.runner, '127.0.0.1', port).start()
+        self.uri = 'http://127.0.0.1:{}/'.format(port)
+
+    async def on_request(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        asyncio.ensure_future(self.verify(dict(form)))
+        return web.Response(status=202)
+
+    async def verify(self, form: dict) -> None:
+        challenge = secrets.token_hex(8)
+        params = {'hub.mode': form['hub.mode'], 'hub.topic': form['hub.topic'],
+                  'hub.challenge': challenge, 'hub.lease_seconds': '600'}
+        async with self.session.get(form['hub.callback'], params=params) as resp:
+            if resp.status == 200 and await resp.text() == challenge:
+                if form['hub.mode'] == 'subscribe':
+                    self.subscriptions[form['hub.topic']] = (form['hub.callback'], form['hub.secret'])
+                else:
+                    del self.subscriptions[form['hub.topic']]
+        self.verified.set()
+
+    async def publish(self, topic: str, body: bytes, secret: str = None) -> int:
+        callback, subscription_secret = self.subscriptions[topic]
+        signature = hmac.new((secret or subscription_secret).encode(), body, hashlib.sha256).hexdigest()
+        async with self.session.post(callback, data=body, headers={'X-Hub-Signature': 'sha256=' + signature}) as resp:
+            return resp.status
+
+
+class TestWebSub(TestCase):
+
+    def test_signature_matches(self):
+        signature = 'sha1=' + hmac.new(b'secret', b'body', hashlib.sha1).hexdigest()
+        self.assertTrue(signature_matches('secret', b'body', signature))
+        self.assertFalse(signature_matches('secret', b'other body', signature))
+        self.assertFalse(signature_matches('secret', b'body', 'md5=' + hashlib.md5(b'body').hexdigest()))
+        self.assertFalse(signature_matches('secret', b'body', None))
+
+    def test_subscribe_and_receive_through_a_hub(self):
+        feed = Feed('Pushed', 'http://127.0.0.1/feed')
+        delivered = []
+        verified = []
+
+        async def run() -> None:
+            async with ClientSession() as session:
+                hub = StandInHub(session)
+                await hub.start()
+                port = free_port()
+                server = WebSubServer(
+                    'http://127.0.0.1:{}'.format(port),
+                    port,
+                    lambda feed, body, encoding: delivered.append((feed, body)),
+                    lambda feed, state: verified.append(state.lease_expires))
+                await server.start()
+                state = FeedState(hub=hub.uri)
+                self.assertTrue(server.needs_subscription(feed, state, time.time()))
+                try:
+                    await server.subscribe(session, feed, state)
+                    self.assertFalse(server.needs_subscription(feed, state, time.time()))  # Awaiting verification
+                    await asyncio.wait_for(hub.verified.wait(), 5)
+                    self.assertTrue(state.pushed(time.time()))
+                    self.assertFalse(server.needs_subscription(feed, state, time.time()))
+
+                    self.assertEqual(await hub.publish(feed.uri, b'<rss/>'), 202)
+                    self.assertEqual(await hub.publish(feed.uri, b'<forged/>', secret='wrong'), 202)
+
+                    hub.verified.clear()
+                    await server.subscribe(session, feed, state, 'unsubscribe')
+                    await asyncio.wait_for(hub.verified.wait(), 5)
+                    self.assertFalse(state.pushed(time.time()))
+                    self.assertEqual(hub.subscriptions, dict())
+                finally:
+                    await server.stop()
+                    await hub.runner.cleanup()
+
+        asyncio.run(run())
+        self.assertEqual(delivered, [(feed, b'<rss/>')])  # The forged delivery was dropped
+        self.assertEqual(len(verified), 2)
+        self.assertIsNone(verified[-1])
+
+    def test_content_needs_a_verified_subscription(self):
+        feed = Feed('Pushed', 'http://127.0.0.1/feed')
+        delivered = []
+
+        async def run() -> None:
+            async with ClientSession() as session:
+                port = free_port()
+                server = WebSubServer(
+                    'http://127.0.0.1:{}'.format(port),
+                    port,
+                    lambda feed, body, encoding: delivered.append(body),
+                    lambda feed, state: None)
+                await server.start()
+                callback = 'http://127.0.0.1:{}/websub/'.format(port)
+                try:
+                    expired = FeedState(hub='http://127.0.0.1/hub', callback='expired', secret='secret',
+                                        lease_expires=time.time() - 1)
+                    server.register(feed, expired)
+                    unverified = FeedState(hub='http://127.0.0.1/hub')
+                    server.register(feed, unverified)  # Never subscribed, so it has no callback
+                    self.assertEqual(list(server.feeds), ['expired'])
+                    for key in ('expired', 'made-up'):
+                        async with session.post(callback + key, data=b'<rss/>') as resp:
+                            self.assertEqual(resp.status, 410)
+
+                    expired.lease_expires = time.time() + 60
+                    async with session.post(callback + 'expired', data=b'<rss/>') as resp:  # Unsigned
+                        self.assertEqual(resp.status, 202)
+                finally:
+                    await server.stop()
+
+        asyncio.run(run())
+        self.assertEqual(delivered, [])
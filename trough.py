@@ -18,54 +18,34 @@
     Trough homepage: https://github.com/glu10/trough
 """
 
+import asyncio
+import os
+import runpy
 import signal
 import sys
 
-import gi
-
-gi.require_version('Gdk', '3.0')
-gi.require_version('Gtk', '3.0')
-from gi.repository import Gdk, Gio, Gtk
-
-from cache import Cache
-from mainWindow import MainWindow
-from preferences import Preferences
-
-
-class Trough(Gtk.Application):
-    """ Beginning of the application: init -> run() -> startup signal -> activate signal """
-
-    def __init__(self):
-        super().__init__(application_id='org.glu10.trough', flags=Gio.ApplicationFlags.FLAGS_NONE)
-        self.main_window = None
-        self.preferences = None
-        self.cache = None
-        self.connect('activate', self.do_activate)
-
-    def do_startup(self) -> None:
-        Gtk.Application.do_startup(self)
-        self.preferences = Preferences(load_from_file=True)
-        self.cache = Cache(load_from_file=True)
-
-    def do_activate(self, *args) -> None:
-        if not self.main_window and self.preferences and self.cache:
-            self.main_window = MainWindow(
-                self.preferences,
-                self.cache,
-                application=self,
-                title='Trough')
-            self.main_window.connect('delete_event', self.on_quit)
-            self.add_window(self.main_window)
-            self.main_window.present()
-
-    def on_quit(self, widget: Gtk.Widget, event: Gdk.Event) -> None:
-        self.cache.write_cache()
-        self.quit()
-
+if __name__ == '__main__' and '--headless' in sys.argv[1:]:
+    # Run before GTK is imported, as the main module so that the extraction processes don't import GTK either.
+    sys.argv = [argument for argument in sys.argv if argument != '--headless']
+    runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'headless.py'), run_name='__main__')
 
 if __name__ == '__main__':
     signal.signal(signal.SIGINT, signal.SIG_DFL)  # Respond to Ctrl+C
 
-    # Start things up
-    trough = Trough()
+    if '--glib-loop' in sys.argv[1:]:
+        # Requests run on the GTK main context rather than on a thread of their own, see Gatherer.
+        sys.argv = [argument for argument in sys.argv if argument != '--glib-loop']
+        try:
+            from gi.events import GLibEventLoopPolicy
+            asyncio.set_event_loop_policy(GLibEventLoopPolicy())
+        except ImportError:
+            print('--glib-loop needs PyGObject 3.50 or newer, gathering on a thread instead.', file=sys.stderr)
+
+    sqlite_cache = '--sqlite-cache' in sys.argv[1:]
+    sys.argv = [argument for argument in sys.argv if argument != '--sqlite-cache']
+
+    # Start things up. GTK is only imported here: the extraction and gathering processes are spawned, and import
+    # this module again as their main module, which must stay light for them.
+    from troughApplication import Trough
+    trough = Trough(sqlite_cache)
     trough.run(sys.argv)
@@ -26,6 +26,7 @@ require_version('Gtk', '3.0')
 require_version('Gdk', '3.0')
 from gi.repository import Gtk, Pango
 
+from item import Item
 from newsStore import NewsStore
 from newsView import NewsView
 from textFormat import TextFormat
@@ -45,6 +46,8 @@ class TwoPaneView(NewsView):
 
         self.headline_changed_handler = None
         self.toggle_headline_listening()
+        self.shown_uri = None
+        self.row_changed_handler = self.news_store.model().connect('row-changed', self.on_row_changed)
 
         self.content_scroll, self.content_view = self.create_content_box()
         self.headline_content_pane = Gtk.Paned(orientation=Gtk.Orientation.HORIZONTAL)
@@ -104,8 +107,35 @@ class TwoPaneView(NewsView):
         else:
             self.content_view.grab_focus()
 
+    def destroy_display(self) -> None:
+        self.news_store.model().disconnect(self.row_changed_handler)
+        super().destroy_display()
+
     def show_new_content(self, tree_view: Gtk.TreeView) -> None:
         model, it = tree_view.get_selection().get_selected()
         if model and it:
             item = self.news_store.row_to_item(model[it])
+            self.shown_uri = item.uri
+            TextFormat.prepare_content_display(item, self.content_view)
+            self.notify_reading(model, it, item)
+
+    def notify_reading(self, model: Gtk.TreeModel, it: Gtk.TreeIter, item: Item) -> None:
+        """ Reading direction is guessed from where the previously shown item was. """
+        index = model.get_path(it).get_indices()[0]
+        direction = -1 if index < self.last_item_index else 1
+        self.last_item_index = index
+
+        if self.reading_listener:
+            upcoming = []
+            for offset in range(1, self.prefetch_distance + 1):
+                position = index + direction * offset
+                if not 0 <= position < len(model):
+                    break
+                upcoming.append(self.news_store.row_to_item(model[position]))
+            self.reading_listener(item, upcoming)
+
+    def on_row_changed(self, model: Gtk.TreeModel, path: Gtk.TreePath, it: Gtk.TreeIter) -> None:
+        """ Shows an article that arrived after its item was selected. """
+        item = self.news_store.row_to_item(model[it])
+        if item.uri == self.shown_uri:
             TextFormat.prepare_content_display(item, self.content_view)
@@ -18,10 +18,7 @@
     Trough homepage: https://github.com/glu10/trough
 """
 
-import errno
-import json
-import os
-from typing import Any, Callable
+from typing import Callable
 
 from gi import require_version
 
@@ -29,40 +26,6 @@ require_version('Gtk', '3.0')
 require_version('Gdk', '3.0')
 from gi.repository import Gdk, Gio, Gtk
 
-""" FILE OPERATIONS """
-
-
-def ensure_directory_exists(directory: str):
-    """ Checks to see if the given directory exists, and if it doesn't creates it. """
-    try:
-        os.makedirs(directory)
-    except OSError as exception:
-        if exception.errno != errno.EEXIST:
-            raise
-
-
-def ensured_read_json_file(containing_directory: str, filename: str, defaults: Any):
-    """ Read a JSON file or pass back the defaults if the file doesn't exist. """
-    file_path = os.path.join(containing_directory, filename)
-    if not os.path.isfile(file_path):
-        return defaults
-
-    with open(file_path, 'r') as data_file:
-        try:
-            return json.load(data_file)
-        except json.decoder.JSONDecodeError as e:
-            raise RuntimeError('Error parsing the JSON in ' + file_path + ', is it valid JSON?') from e
-
-
-def write_json_file(containing_directory: str, filename: str, data):
-    ensure_directory_exists(containing_directory)
-    file_path = os.path.join(containing_directory, filename)
-    with open(file_path, 'w') as data_file:
-        json.dump(data, data_file)
-
-
-""" END FILE OPERATIONS """
-
 """ GENERIC DIALOGS """
 
 
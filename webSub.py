@@ -0,0 +1,171 @@
+"""
+    Trough - a GTK+ RSS news reader
+
+    Copyright (C) 2017 Andrew Asp
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see {http://www.gnu.org/licenses/}.
+
+    Trough homepage: https://github.com/glu10/trough
+"""
+
+
+import hmac
+import logging
+import secrets
+import time
+from typing import Callable, Optional
+
+from aiohttp import ClientSession, web
+
+from feed import Feed
+from feedState import FeedState
+
+logger = logging.getLogger(__name__)
+
+signature_methods = {'sha1', 'sha256', 'sha384', 'sha512'}
+
+
+def signature_matches(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """ Checks an X-Hub-Signature header, 'method=hexdigest', against the body. """
+    method, _, digest = (signature or '').partition('=')
+    if method not in signature_methods:
+        return False
+    expected = hmac.new(secret.encode(), body, method).hexdigest()
+    return hmac.compare_digest(expected, digest)
+
+
+class WebSubServer:
+    """
+    Subscribes to the WebSub (PubSubHubbub) hubs feeds advertise and receives what they push on a small local server.
+    Each subscription has a random callback of its own, so a delivery is matched to its feed without trusting
+    anything in it, and nobody but the hub knows where to push.
+    See https://www.w3.org/TR/websub/
+    """
+    lease_seconds = 7 * 24 * 60 * 60  # Asked for when subscribing, the hub decides
+    renewal_point = 0.9  # Fraction of a lease after which it's renewed
+
+    def __init__(
+            self,
+            callback_url: str,
+            port: int,
+            deliver: Callable[[Feed, bytes, Optional[str]], None],
+            verified: Callable[[Feed, FeedState], None]):
+        """
+        callback_url is where hubs reach the server, port is what it listens on (behind a proxy these differ).
+        deliver is called with content pushed for a feed, verified once a hub confirms a subscription.
+        """
+        self.callback_url = callback_url.rstrip('/') + '/websub/'
+        self.port = port
+        self.deliver = deliver
+        self.verified = verified
+        self.feeds = dict()  # Callback id -> (Feed, FeedState) of every subscription, verified or not
+        self.pending = dict()  # Callback id -> mode of a request the hub has yet to verify
+        self.runner = None
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get('/websub/{callback_id}', self.on_verification)
+        app.router.add_post('/websub/{callback_id}', self.on_content)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, port=self.port).start()
+
+    async def stop(self) -> None:
+        if self.runner is not None:
+            await self.runner.cleanup()
+
+    def register(self, feed: Feed, state: FeedState) -> None:
+        """ Lets the server answer for a feed subscribed to in an earlier session. """
+        if state.hub and state.callback:
+            self.feeds[state.callback] = (feed, state)
+
+    def is_registered(self, state: FeedState) -> bool:
+        return state.callback is not None and state.callback in self.feeds
+
+    def needs_subscription(self, feed: Feed, state: FeedState, now: float) -> bool:
+        return bool(state.hub) and state.callback not in self.pending and (state.renew_after or 0) <= now
+
+    async def subscribe(self, session: ClientSession, feed: Feed, state: FeedState, mode: str = 'subscribe') -> None:
+        """
+        Asks the hub for a subscription, which is only active once the hub verifies it with the server.
+        A new subscription gets a new callback and secret, renewing one keeps them.
+        """
+        if mode == 'subscribe':
+            if not self.is_registered(state):
+                state.callback = secrets.token_urlsafe(16)
+                state.secret = secrets.token_hex(20)
+            self.feeds[state.callback] = (feed, state)
+        key = state.callback
+        self.pending[key] = mode
+        try:
+            async with session.post(state.hub, data={
+                    'hub.callback': self.callback_url + key,
+                    'hub.mode': mode,
+                    'hub.topic': state.topic or feed.uri,
+                    'hub.lease_seconds': str(self.lease_seconds),
+                    'hub.secret': state.secret or ''}) as resp:
+                resp.raise_for_status()
+        except BaseException:
+            del self.pending[key]
+            raise
+
+    async def on_verification(self, request: web.Request) -> web.Response:
+        """ The hub checks that a (un)subscription was really asked for by echoing its challenge. """
+        key = request.match_info['callback_id']
+        mode = request.query.get('hub.mode')
+        if key not in self.feeds:
+            return web.Response(status=404)
+        feed, state = self.feeds[key]
+
+        if mode == 'denied':
+            logger.warning('%s refused a subscription to %s: %s', state.hub, feed.uri, request.query.get('hub.reason'))
+            self.pending.pop(key, None)
+            self.forget(key, state)
+            return web.Response()
+        if self.pending.get(key) != mode or request.query.get('hub.topic') != (state.topic or feed.uri):
+            return web.Response(status=404)
+
+        del self.pending[key]
+        if mode == 'subscribe':
+            try:
+                lease = float(request.query.get('hub.lease_seconds', self.lease_seconds))
+            except ValueError:
+                lease = self.lease_seconds
+            now = time.time()
+            state.lease_expires = now + lease
+            state.renew_after = now + lease * self.renewal_point
+        else:
+            self.forget(key, state)
+        self.verified(feed, state)
+        return web.Response(text=request.query.get('hub.challenge', ''))
+
+    def forget(self, key: str, state: FeedState) -> None:
+        """ The subscription is over, its callback won't be used again. """
+        self.feeds.pop(key, None)
+        state.callback = state.secret = state.lease_expires = state.renew_after = None
+
+    async def on_content(self, request: web.Request) -> web.Response:
+        """
+        Only verified subscriptions with a secret receive content, anything else is told it's gone.
+        Content that fails the signature check is still acknowledged, as the standard asks, but dropped.
+        """
+        key = request.match_info['callback_id']
+        feed, state = self.feeds.get(key, (None, None))
+        if state is None or not state.secret or not state.pushed(time.time()):
+            return web.Response(status=410)  # Gone, the hub stops pushing
+        body = await request.read()
+        if not signature_matches(state.secret, body, request.headers.get('X-Hub-Signature')):
+            logger.warning('Dropped content pushed for %s with a bad signature', feed.uri)
+        else:
+            self.deliver(feed, body, request.charset)
+        return web.Response(status=202)